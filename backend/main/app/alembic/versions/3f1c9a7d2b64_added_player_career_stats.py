@@ -0,0 +1,83 @@
+"""Added player career stats
+
+Revision ID: 3f1c9a7d2b64
+Revises: e27b750d946c
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, None] = 'e27b750d946c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The API's create_all() (without FAST_START) may have created the table
+    # before this ran, and then filled it for new games only
+    if not sa.inspect(op.get_bind()).has_table('playercareerstats'):
+        op.create_table(
+            'playercareerstats',
+            sa.Column('player_id', sa.Uuid(), nullable=False),
+            sa.Column('games', sa.Integer(), nullable=False),
+            sa.Column('goals', sa.Integer(), nullable=False),
+            sa.Column('assists', sa.Integer(), nullable=False),
+            sa.Column('wins', sa.Integer(), nullable=False),
+            sa.Column('draws', sa.Integer(), nullable=False),
+            sa.Column('losses', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+            sa.PrimaryKeyConstraint('player_id')
+        )
+    # Backfill from the existing match history (same logic as app.models.stats)
+    op.execute("DELETE FROM playercareerstats")
+    op.execute("""
+        WITH team_goals AS (
+            SELECT game_id, team_id, count(*) AS goals
+            FROM goal
+            GROUP BY game_id, team_id
+        ),
+        results AS (
+            SELECT gp.player_id,
+                   count(*) AS games,
+                   sum(CASE WHEN coalesce(f.goals, 0) > coalesce(a.goals, 0) THEN 1 ELSE 0 END) AS wins,
+                   sum(CASE WHEN coalesce(f.goals, 0) = coalesce(a.goals, 0) THEN 1 ELSE 0 END) AS draws,
+                   sum(CASE WHEN coalesce(f.goals, 0) < coalesce(a.goals, 0) THEN 1 ELSE 0 END) AS losses
+            FROM gameplayer gp
+            JOIN game g ON g.id = gp.game_id
+            LEFT JOIN team_goals f ON f.game_id = gp.game_id AND f.team_id = gp.team_id
+            LEFT JOIN team_goals a ON a.game_id = gp.game_id AND a.team_id =
+                CASE WHEN gp.team_id = g.home_team_id THEN g.away_team_id ELSE g.home_team_id END
+            GROUP BY gp.player_id
+        ),
+        scored AS (
+            SELECT scorer_id, count(*) AS goals FROM goal GROUP BY scorer_id
+        ),
+        assisted AS (
+            SELECT assister_id, count(*) AS assists FROM goal
+            WHERE assister_id IS NOT NULL GROUP BY assister_id
+        )
+        INSERT INTO playercareerstats (player_id, games, goals, assists, wins, draws, losses)
+        SELECT p.id,
+               coalesce(r.games, 0),
+               coalesce(s.goals, 0),
+               coalesce(x.assists, 0),
+               coalesce(r.wins, 0),
+               coalesce(r.draws, 0),
+               coalesce(r.losses, 0)
+        FROM player p
+        LEFT JOIN results r ON r.player_id = p.id
+        LEFT JOIN scored s ON s.scorer_id = p.id
+        LEFT JOIN assisted x ON x.assister_id = p.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('playercareerstats')
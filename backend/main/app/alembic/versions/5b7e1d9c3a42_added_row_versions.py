@@ -0,0 +1,32 @@
+"""Added row versions
+
+Revision ID: 5b7e1d9c3a42
+Revises: 8a2d4e6f0c13
+Create Date: 2026-10-17 13:05:22.417390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e1d9c3a42'
+down_revision: Union[str, None] = '8a2d4e6f0c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('game', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('player', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('stadium', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('stadium', 'version')
+    op.drop_column('player', 'version')
+    op.drop_column('game', 'version')
@@ -0,0 +1,49 @@
+"""Added denormalized score counters
+
+Revision ID: 8a2d4e6f0c13
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-17 11:40:05.902771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a2d4e6f0c13'
+down_revision: Union[str, None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('game', sa.Column('home_score', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('game', sa.Column('away_score', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('gameplayer', sa.Column('goals', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('gameplayer', sa.Column('assists', sa.Integer(), nullable=False, server_default='0'))
+    # Backfill from the goal table (same logic as app.models.stats.recount_games)
+    op.execute("""
+        UPDATE game SET
+            home_score = (SELECT count(*) FROM goal
+                          WHERE goal.game_id = game.id AND goal.team_id = game.home_team_id),
+            away_score = (SELECT count(*) FROM goal
+                          WHERE goal.game_id = game.id AND goal.team_id = game.away_team_id)
+    """)
+    op.execute("""
+        UPDATE gameplayer SET
+            goals = (SELECT count(*) FROM goal
+                     WHERE goal.game_id = gameplayer.game_id AND goal.scorer_id = gameplayer.player_id),
+            assists = (SELECT count(*) FROM goal
+                       WHERE goal.game_id = gameplayer.game_id AND goal.assister_id = gameplayer.player_id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('gameplayer', 'assists')
+    op.drop_column('gameplayer', 'goals')
+    op.drop_column('game', 'away_score')
+    op.drop_column('game', 'home_score')
@@ -0,0 +1,38 @@
+"""Added unique lineup entries
+
+Revision ID: a6c2e8f4d017
+Revises: f3b9e5c1d784
+Create Date: 2026-10-17 20:41:12.563018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e8f4d017'
+down_revision: Union[str, None] = 'f3b9e5c1d784'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Repeated entries carry the same goal/assist counters, keep one of each.
+    # Career rows counted them twice: run python -m app.commands.rebuild_player_stats
+    # afterwards if any were removed.
+    op.execute("""
+        DELETE FROM gameplayer AS duplicate
+        USING gameplayer AS kept
+        WHERE duplicate.game_id = kept.game_id
+          AND duplicate.player_id = kept.player_id
+          AND duplicate.id > kept.id
+    """)
+    op.create_unique_constraint(op.f('uq_gameplayer_game_id_player_id'), 'gameplayer', ['game_id', 'player_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(op.f('uq_gameplayer_game_id_player_id'), 'gameplayer', type_='unique')
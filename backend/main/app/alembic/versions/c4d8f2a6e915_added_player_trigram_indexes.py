@@ -0,0 +1,34 @@
+"""Added player trigram indexes
+
+Revision ID: c4d8f2a6e915
+Revises: 5b7e1d9c3a42
+Create Date: 2026-10-17 14:12:48.530216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8f2a6e915'
+down_revision: Union[str, None] = '5b7e1d9c3a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Serve both the similarity operator (%) and ILIKE '%...%' in player search
+    op.create_index('ix_player_name_trgm', 'player', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_player_nickname_trgm', 'player', ['nickname'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'nickname': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_player_nickname_trgm', table_name='player')
+    op.drop_index('ix_player_name_trgm', table_name='player')
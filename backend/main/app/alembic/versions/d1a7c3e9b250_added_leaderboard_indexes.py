@@ -0,0 +1,33 @@
+"""Added leaderboard indexes
+
+Revision ID: d1a7c3e9b250
+Revises: c4d8f2a6e915
+Create Date: 2026-10-17 14:58:03.117642
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1a7c3e9b250'
+down_revision: Union[str, None] = 'c4d8f2a6e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all() builds these with the table when it got there first
+    op.create_index(op.f('ix_playercareerstats_goals'), 'playercareerstats', ['goals'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_playercareerstats_assists'), 'playercareerstats', ['assists'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_playercareerstats_wins'), 'playercareerstats', ['wins'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_playercareerstats_wins'), table_name='playercareerstats')
+    op.drop_index(op.f('ix_playercareerstats_assists'), table_name='playercareerstats')
+    op.drop_index(op.f('ix_playercareerstats_goals'), table_name='playercareerstats')
@@ -20,13 +20,81 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Databases created by create_all() before migrations were introduced
+    # already have these tables, the later revisions build on top of them
+    if sa.inspect(op.get_bind()).has_table('game'):
+        return
+    op.create_table(
+        'stadium',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('address', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stadium_name'), 'stadium', ['name'], unique=False)
+    op.create_table(
+        'player',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('nickname', sa.String(), nullable=True),
+        sa.Column('profile', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_player_name'), 'player', ['name'], unique=False)
+    op.create_table(
+        'team',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'game',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('stadium_id', sa.Uuid(), nullable=True),
+        sa.Column('home_team_id', sa.Uuid(), nullable=False),
+        sa.Column('away_team_id', sa.Uuid(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['stadium_id'], ['stadium.id'], ),
+        sa.ForeignKeyConstraint(['home_team_id'], ['team.id'], ),
+        sa.ForeignKeyConstraint(['away_team_id'], ['team.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_game_date'), 'game', ['date'], unique=False)
+    op.create_table(
+        'gameplayer',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('game_id', sa.Uuid(), nullable=False),
+        sa.Column('player_id', sa.Uuid(), nullable=False),
+        sa.Column('team_id', sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+        sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+        sa.ForeignKeyConstraint(['team_id'], ['team.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'goal',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('game_id', sa.Uuid(), nullable=False),
+        sa.Column('team_id', sa.Uuid(), nullable=False),
+        sa.Column('scorer_id', sa.Uuid(), nullable=False),
+        sa.Column('assister_id', sa.Uuid(), nullable=True),
+        sa.Column('minute', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+        sa.ForeignKeyConstraint(['team_id'], ['team.id'], ),
+        sa.ForeignKeyConstraint(['scorer_id'], ['player.id'], ),
+        sa.ForeignKeyConstraint(['assister_id'], ['player.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_table('goal')
+    op.drop_table('gameplayer')
+    op.drop_index(op.f('ix_game_date'), table_name='game')
+    op.drop_table('game')
+    op.drop_table('team')
+    op.drop_index(op.f('ix_player_name'), table_name='player')
+    op.drop_table('player')
+    op.drop_index(op.f('ix_stadium_name'), table_name='stadium')
+    op.drop_table('stadium')
@@ -0,0 +1,50 @@
+"""Added foreign key indexes
+
+Revision ID: f3b9e5c1d784
+Revises: d1a7c3e9b250
+Create Date: 2026-10-17 16:21:37.904518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9e5c1d784'
+down_revision: Union[str, None] = 'd1a7c3e9b250'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('goal', 'game_id'),
+    ('goal', 'team_id'),
+    ('goal', 'scorer_id'),
+    ('goal', 'assister_id'),
+    ('gameplayer', 'game_id'),
+    ('gameplayer', 'player_id'),
+    ('gameplayer', 'team_id'),
+    ('game', 'home_team_id'),
+    ('game', 'away_team_id'),
+    ('game', 'stadium_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and does not
+    # block writes while the index builds. IF NOT EXISTS lets a rerun pick up
+    # after an interrupted build (drop any index left INVALID first).
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, column in reversed(INDEXES):
+            op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
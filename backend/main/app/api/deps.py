@@ -1,14 +1,67 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 from typing import Annotated
 
-from fastapi import Depends
-from sqlmodel import Session
+from fastapi import Depends, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.db import engine
+from app.core.config import settings
+from app.core.db import async_engine, replica_engine
 
+# Set on a client after each of its writes, keeps its reads on the primary
+READ_PRIMARY_COOKIE = "igloo_read_primary"
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+# session.info flag of sessions reading from the replica
+REPLICA = "replica"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    # Objects stay usable after commit: touching an expired attribute would
+    # need implicit IO, which an AsyncSession does not allow
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
-SessionDep = Annotated[Session, Depends(get_db)]
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only routes: on the replica if there is one, unless the client wrote recently"""
+    engine = async_engine
+    if replica_engine is not None and READ_PRIMARY_COOKIE not in request.cookies:
+        engine = replica_engine
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.info[REPLICA] = engine is replica_engine
+        yield session
+
+
+class ReadAfterWriteMiddleware:
+    """Pin a client's reads to the primary for a while after each successful write.
+
+    Replicas lag behind the primary, so without it a client could create a
+    game and not find it on the next page load. Only set when a replica is
+    configured.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or replica_engine is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}=1; Max-Age={settings.POSTGRES_READ_AFTER_WRITE}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_db)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
@@ -0,0 +1,39 @@
+import hashlib
+from typing import Iterable
+
+from fastapi import Request, Response
+
+
+def entity_etag(id, version: int) -> str:
+    """Strong ETag of a single row"""
+    return f'"{id}-{version}"'
+
+
+def page_etag(rows: Iterable[tuple]) -> str:
+    """Strong ETag of a page, from the (id, version) of every row on it"""
+    digest = hashlib.sha1()
+    for id, version in rows:
+        digest.update(f"{id}-{version};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the client already holds the representation tagged `etag`"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Cacheable, but revalidate every time: a 304 is cheap
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def not_modified(etag: str, headers: dict = None) -> Response:
+    response = Response(status_code=304, headers=headers)
+    set_etag(response, etag)
+    return response
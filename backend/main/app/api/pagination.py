@@ -0,0 +1,80 @@
+import base64
+import binascii
+from datetime import datetime
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import literal, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    """Turn the sort key of a row into an opaque, URL-safe cursor"""
+    payload = json.dumps([
+        value.isoformat() if isinstance(value, datetime) else str(value)
+        for value in values
+    ])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    """Inverse of encode_cursor(), typed after the sort columns"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [_parse(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse(column, value: str):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:  # e.g. SQLModel's AutoString
+        python_type = str
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def paginate(
+    statement,
+    columns,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    descending: bool = False,
+):
+    """Order a statement by `columns` and fetch the page after `cursor`.
+
+    `columns` must end with a unique column (the primary key) so the order
+    is total. With a cursor the page starts right after the row it encodes
+    and `skip` is ignored; without one this falls back to offset paging.
+    """
+    order_by = [column.desc() if descending else column for column in columns]
+    statement = statement.order_by(*order_by).limit(limit)
+
+    if cursor is None:
+        return statement.offset(skip)
+
+    key = tuple_(*columns)
+    after = tuple_(*[
+        literal(value, column.type)
+        for column, value in zip(columns, decode_cursor(cursor, columns))
+    ])
+    return statement.where(key < after if descending else key > after)
+
+
+def set_next_cursor(response: Response, page: list, limit: int, columns) -> None:
+    """Expose the cursor of the page's last row when more rows may follow"""
+    if not page or len(page) < limit:
+        return
+
+    last = page[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        [getattr(last, column.key) for column in columns]
+    )
@@ -0,0 +1,23 @@
+from typing import Any
+
+from fastapi import Response
+import orjson
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes laid out as Pydantic would write them (UTC as "Z")"""
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(Response):
+    """JSON response written straight from plain dicts and lists.
+
+    Returning a Response skips FastAPI's validation against the route's
+    response_model, which still documents the payload in OpenAPI: the
+    content must already have that shape, as built by the *_payload() helpers
+    of app.models.schema and app.models.stats.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,56 @@
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.model import Game
+from app.api.deps import get_read_db
+from app.api.responses import dumps
+from app.models.loaders import game_graph_options
+from app.models.schema import game_payload
+
+router = APIRouter(
+    prefix="/api/export",
+    tags=["export"],
+)
+
+EXPORT_BATCH_SIZE = 200
+
+async def stream_games(session: AsyncSession, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """Yield every game as one JSON line, oldest first.
+
+    Games come through a server-side cursor `batch_size` rows at a time,
+    each batch with its lineups and goals fetched in one go. The session's
+    identity map only holds weak references to unmodified objects, so a
+    batch is freed once written and memory stays flat however large the
+    archive is.
+    """
+    statement = (
+        select(Game)
+        .options(*game_graph_options())
+        .order_by(Game.date, Game.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream_scalars(statement)
+    async for games in result.partitions():
+        for game in games:
+            yield dumps(game_payload(game)) + b"\n"
+
+
+@router.get("/games.ndjson")
+async def export_games(session: AsyncSession = Depends(get_read_db)):
+    """Stream the whole match archive as newline-delimited JSON (one GameRead per line)"""
+    async def body():
+        # The request session is closed before the body is sent, so the
+        # stream runs on its own session against the same engine
+        async with AsyncSession(session.bind, expire_on_commit=False) as export_session:
+            async for line in stream_games(export_session, EXPORT_BATCH_SIZE):
+                yield line
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="games.ndjson"'},
+    )
@@ -1,47 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional
 import uuid
 from datetime import datetime, timezone
 
-from app.models.model import Game, GamePlayer, Goal, Player, Team
-from app.api.deps import get_db
-from app.models.schema import GameCreate, GamePlayerCreate, GameRead, GoalCreate, get_game
+from app.models.model import Game, GamePlayer, Goal, Player, Stadium, Team
+from app.api.deps import REPLICA, get_db, get_read_db
+from app.api.etag import entity_etag, etag_matches, not_modified, page_etag, set_etag
+from app.api.pagination import paginate, set_next_cursor
+from app.api.responses import FastJSONResponse, dumps
+from app.core.cache import game_cache
+from app.core.events import game_events, sse_stream
+from app.models.loaders import load_game, load_games
+from app.models.stats import count_lineup_goals, game_player_ids, recount_games, record_appearance, record_goal, refresh_player_stats, remove_goal
+from app.models.schema import GameCreate, GamePlayerCreate, GameRead, GoalCreate, GoalRead, PlayerRead, game_payload, get_game
+from app.models.versions import bump_versions
 
 router = APIRouter(
     prefix="/api/games",
     tags=["games"],
 )
 
+async def _publish(session: AsyncSession, game_id: uuid.UUID, type: str, **data):
+    """Push a change to the game's live event stream once the session commits"""
+    await game_events.publish(session, game_id, type, jsonable_encoder(data))
+
+async def _transition(session: AsyncSession, game_id: uuid.UUID, condition, **values) -> bool:
+    """Update a game (bumping its version) only if it still meets `condition`; False when no row matched"""
+    statement = (
+        update(Game)
+        .where(Game.id == game_id, condition)
+        .values(**values, version=Game.version + 1)
+        .returning(Game.id)
+        .execution_options(synchronize_session=False)
+    )
+    return (await session.exec(statement)).first() is not None
+
+async def _check_lineup(
+    session: AsyncSession, game_id: uuid.UUID, lineup: list[GamePlayerCreate]
+) -> tuple[Game, dict[uuid.UUID, Player]]:
+    """Validate new lineup entries, returning the game and the players by id"""
+    game = await session.get(Game, game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    if any(entry.team_id not in [game.home_team_id, game.away_team_id] for entry in lineup):
+        raise HTTPException(status_code=400, detail="Team must be participating")
+
+    player_ids = [entry.player_id for entry in lineup]
+    if len(set(player_ids)) != len(player_ids):
+        raise HTTPException(status_code=400, detail="Player listed more than once")
+
+    # One query tells both which players exist and which are already playing
+    known = (await session.exec(
+        select(Player, GamePlayer.id)
+        .outerjoin(GamePlayer, (GamePlayer.player_id == Player.id) & (GamePlayer.game_id == game_id))
+        .where(Player.id.in_(player_ids))
+    )).all()
+    if len({player.id for player, _ in known}) != len(player_ids):
+        raise HTTPException(status_code=404, detail="Player not found")
+    if any(game_player_id for _, game_player_id in known):
+        raise HTTPException(status_code=400, detail="Player already in this game")
+    return game, {player.id: player for player, _ in known}
+
 @router.post("/{game_id}/players")
-def add_player_to_game(
+async def add_player_to_game(
     game_id: uuid.UUID,
     gameplayer_data: GamePlayerCreate,
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_db)
 ):
     """Add a player to a game on a specific team"""
-    game = session.get(Game, game_id)
-    player = session.get(Player, gameplayer_data.player_id)
-    team = session.get(Team, gameplayer_data.team_id)
-    
-    if not game or not player or not team:
-        raise HTTPException(status_code=404, detail="Game or Player not found")
+    game, players = await _check_lineup(session, game_id, [gameplayer_data])
+    player = players[gameplayer_data.player_id]
 
     game_player = GamePlayer(game_id=game_id, player_id=gameplayer_data.player_id, team_id=gameplayer_data.team_id)
+    await session.run_sync(count_lineup_goals, game_player)
     session.add(game_player)
-    session.commit()
+    await session.run_sync(record_appearance, game, game_player)
+    await session.run_sync(bump_versions, Game, [game_id])
+    await _publish(session, game_id, "lineup", players=[
+        {"team_id": gameplayer_data.team_id, "player": PlayerRead.model_validate(player)}
+    ])
+    await session.commit()
+    game_cache.invalidate([game_id])
     return {"message": f"{player.name} added to team {gameplayer_data.team_id}"}
 
 
+@router.post("/{game_id}/players:batch", response_model=GameRead)
+async def add_players_to_game(
+    game_id: uuid.UUID,
+    lineup: list[GamePlayerCreate],
+    session: AsyncSession = Depends(get_db)
+):
+    """Add many players to a game at once, all or nothing"""
+    game, _ = await _check_lineup(session, game_id, lineup)
+    player_ids = [entry.player_id for entry in lineup]
+
+    if lineup:
+        await session.exec(insert(GamePlayer), params=[
+            {"game_id": game_id, "player_id": entry.player_id, "team_id": entry.team_id}
+            for entry in lineup
+        ])
+        if game.home_score or game.away_score:
+            await session.run_sync(recount_games, [game_id])
+        await session.run_sync(refresh_player_stats, player_ids)
+        await session.run_sync(bump_versions, Game, [game_id])
+    game_read = get_game(await load_game(session, game_id))
+    if lineup:
+        added = set(player_ids)
+        await _publish(session, game_id, "lineup", players=[
+            {"team_id": team.id, "player": PlayerRead.model_validate(player)}
+            for team in [game_read.home_team, game_read.away_team]
+            for player in team.players
+            if player.id in added
+        ])
+        await session.commit()
+        game_cache.invalidate([game_id])
+    return game_read
+
+
 @router.post("/{game_id}/goals")
-def add_goal(
+async def add_goal(
     game_id: uuid.UUID,
     goal_data: GoalCreate,
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_db)
 ):
     """Record a goal in a game"""
-    game = session.get(Game, game_id)
-    scorer = session.get(Player, goal_data.scorer_id)
+    game = await session.get(Game, game_id)
+    # The assister comes along for the event payload
+    players = {
+        player.id: player
+        for player in (await session.exec(
+            select(Player).where(Player.id.in_({goal_data.scorer_id, goal_data.assister_id} - {None}))
+        )).all()
+    }
+    scorer = players.get(goal_data.scorer_id)
     
     if not game or not scorer:
         raise HTTPException(status_code=404, detail="Game or Player not found")
@@ -57,95 +154,235 @@ def add_goal(
         minute=goal_data.minute
     )
     session.add(goal)
-    session.commit()
+    score = await session.run_sync(record_goal, game, goal)
+    await session.run_sync(bump_versions, Game, [game_id])
+    assister = players.get(goal.assister_id)
+    await _publish(
+        session, game_id, "goals",
+        goals=[GoalRead(id=goal.id, team_id=goal.team_id, minute=goal.minute,
+                        scorer=PlayerRead.model_validate(scorer),
+                        assister=PlayerRead.model_validate(assister) if assister else None)],
+        score=score
+    )
+    await session.commit()
+    game_cache.invalidate([game_id])
     return {"message": f"Goal recorded for {scorer.name}"}
 
-@router.put("/{game_id}/start", response_model=GameRead)
-def start_game(game_id: uuid.UUID, session: Session = Depends(get_db)):
-    """Mark a game as started (set started_at to current UTC time)"""
-    game = session.get(Game, game_id)
+
+@router.post("/{game_id}/goals:batch", response_model=GameRead)
+async def add_goals(
+    game_id: uuid.UUID,
+    goals: list[GoalCreate],
+    session: AsyncSession = Depends(get_db)
+):
+    """Record many goals at once (e.g. a game entered after the final whistle), all or nothing"""
+    game = await session.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    if game.started_at:
+    if any(goal.team_id not in [game.home_team_id, game.away_team_id] for goal in goals):
+        raise HTTPException(status_code=400, detail="Team must be participating")
+
+    player_ids = {goal.scorer_id for goal in goals} | {goal.assister_id for goal in goals if goal.assister_id}
+    known = set((await session.exec(select(Player.id).where(Player.id.in_(player_ids)))).all())
+    if known != player_ids:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    if goals:
+        # render_nulls keeps goals with and without an assister in one statement
+        await session.exec(insert(Goal).execution_options(render_nulls=True), params=[
+            {
+                "game_id": game_id,
+                "team_id": goal.team_id,
+                "scorer_id": goal.scorer_id,
+                "assister_id": goal.assister_id,
+                "minute": goal.minute
+            }
+            for goal in goals
+        ])
+        # Scores and lineup counters are recomputed once instead of bumped per goal
+        await session.run_sync(recount_games, [game_id])
+        await session.run_sync(refresh_player_stats, await session.run_sync(game_player_ids, [game_id]))
+        await session.run_sync(bump_versions, Game, [game_id])
+    game_read = get_game(await load_game(session, game_id))
+    if goals:
+        # Bulk-inserted goals have no ids here: send them all, clients merge by id
+        await _publish(session, game_id, "goals", goals=game_read.goals, score=game_read.score)
+        await session.commit()
+        game_cache.invalidate([game_id])
+    return game_read
+
+
+@router.delete("/{game_id}/goals/{goal_id}")
+async def delete_goal(
+    game_id: uuid.UUID,
+    goal_id: uuid.UUID,
+    session: AsyncSession = Depends(get_db)
+):
+    """Remove a goal recorded by mistake"""
+    game = await session.get(Game, game_id)
+    goal = await session.get(Goal, goal_id)
+    
+    if not game or not goal or goal.game_id != game_id:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    
+    # Deleted first, so a career row computed from scratch no longer counts it
+    await session.delete(goal)
+    score = await session.run_sync(remove_goal, game, goal)
+    await session.run_sync(bump_versions, Game, [game_id])
+    await _publish(session, game_id, "goal_deleted", goal_id=goal_id, score=score)
+    await session.commit()
+    game_cache.invalidate([game_id])
+    return {"message": "Goal deleted"}
+
+@router.put("/{game_id}/start", response_model=GameRead)
+async def start_game(game_id: uuid.UUID, session: AsyncSession = Depends(get_db)):
+    """Mark a game as started (set started_at to current UTC time)"""
+    # Check and write in one conditional UPDATE: of two concurrent starts, one wins
+    if not await _transition(session, game_id, Game.started_at.is_(None), started_at=datetime.now(timezone.utc)):
+        started_at = (await session.exec(select(Game.started_at).where(Game.id == game_id))).first()
+        if started_at is None:
+            raise HTTPException(status_code=404, detail="Game not found")
         raise HTTPException(status_code=400, detail="Game has already started")
 
-    game.started_at = datetime.now(timezone.utc)
-    session.add(game)
-    session.commit()
-    session.refresh(game)
-    return get_game(game)
+    game_read = get_game(await load_game(session, game_id))
+    await _publish(session, game_id, "status", status=game_read.status,
+                   started_at=game_read.started_at, ended_at=game_read.ended_at)
+    await session.commit()
+    return game_read
 
 
 @router.put("/{game_id}/end", response_model=GameRead)
-def end_game(game_id: uuid.UUID, session: Session = Depends(get_db)):
+async def end_game(game_id: uuid.UUID, session: AsyncSession = Depends(get_db)):
     """Mark a game as ended (set ended_at to current UTC time)"""
-    game = session.get(Game, game_id)
+    ended = await _transition(session, game_id, Game.started_at.is_not(None) & Game.ended_at.is_(None),
+                              ended_at=datetime.now(timezone.utc))
+    if not ended:
+        game = (await session.exec(select(Game.started_at, Game.ended_at).where(Game.id == game_id))).first()
+        if game is None:
+            raise HTTPException(status_code=404, detail="Game not found")
+        if not game.started_at:
+            raise HTTPException(status_code=400, detail="Game has not started yet")
+        raise HTTPException(status_code=400, detail="Game has already ended")
+
+    # Career totals follow the score as goals come in, ending changes none of them
+    game_read = get_game(await load_game(session, game_id))
+    await _publish(session, game_id, "status", status=game_read.status,
+                   started_at=game_read.started_at, ended_at=game_read.ended_at)
+    await session.commit()
+    return game_read
+
+@router.get("/{game_id}/events")
+async def stream_game_events(game_id: uuid.UUID, session: AsyncSession = Depends(get_db)):
+    """Live lineup, goal and status changes of a game, as Server-Sent Events"""
+    game = await session.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    if not game.started_at:
-        raise HTTPException(status_code=400, detail="Game has not started yet")
-
     if game.ended_at:
         raise HTTPException(status_code=400, detail="Game has already ended")
 
-    game.ended_at = datetime.now(timezone.utc)
-    session.add(game)
-    session.commit()
-    session.refresh(game)
-    return get_game(game)
+    return StreamingResponse(
+        sse_stream(game_events, game_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/{game_id}", response_model=GameRead)
-def get_game_by_id(game_id: uuid.UUID, session: Session = Depends(get_db)):
-    """Return one game with nested stadium, goals, and players"""
-    game = session.get(Game, game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+async def get_game_by_id(game_id: uuid.UUID, request: Request, session: AsyncSession = Depends(get_read_db)):
+    """Return one game with nested stadium, goals, and players (honours If-None-Match)"""
+    cached = game_cache.get(game_id)
+    if cached is not None:
+        etag, body = cached
+    else:
+        if request.headers.get("if-none-match"):
+            version = (await session.exec(select(Game.version).where(Game.id == game_id))).first()
+            if version is not None and etag_matches(request, entity_etag(game_id, version)):
+                return not_modified(entity_etag(game_id, version))
+
+        game = await load_game(session, game_id)
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
+
+        etag = entity_etag(game.id, game.version)
+        body = dumps(game_payload(game))
+        # Ended games only change through edits that invalidate them; a lagging
+        # replica could still serve one from before such an edit, so only
+        # primary reads fill the cache
+        if game.ended_at and not session.info.get(REPLICA):
+            game_cache.set(game_id, (etag, body))
 
-    return get_game(game)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response = Response(content=body, media_type="application/json")
+    set_etag(response, etag)
+    return response
 
 
 @router.delete("/{game_id}")
-def delete_game(game_id: uuid.UUID, session: Session = Depends(get_db)):
+async def delete_game(game_id: uuid.UUID, session: AsyncSession = Depends(get_db)):
     """Delete a game"""
-    game = session.get(Game, game_id)
+    game = await session.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    session.delete(game)
-    session.commit()
+    player_ids = await session.run_sync(game_player_ids, [game_id])
+    await session.delete(game)
+    await session.run_sync(refresh_player_stats, player_ids)
+    await session.commit()
+    game_cache.invalidate([game_id])
     return {"message": "Game deleted"}
 
 @router.post("", response_model=GameRead)
-def create_game(
+async def create_game(
     game_data: GameCreate,
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_db)
 ):
     """Create a new game"""
-    home_team = Team()
-    away_team = Team()
-    
-    session.add(home_team)
-    session.add(away_team)
-    session.commit()
-    session.refresh(home_team)
-    session.refresh(away_team)
-    
-    game = Game(stadium_id=game_data.stadium_id, date=game_data.date, 
-                home_team_id=home_team.id, away_team_id=away_team.id)
+    stadium = await session.get(Stadium, game_data.stadium_id)
+    if not stadium:
+        raise HTTPException(status_code=404, detail="Stadium not found")
+
+    # Ids are generated client-side and the new collections start out empty,
+    # so the response is built without reading anything back: the teams and
+    # the game go out in one flush, committed once
+    game = Game(
+        date=game_data.date,
+        stadium=stadium,
+        home_team=Team(players=[]),
+        away_team=Team(players=[]),
+        game_players=[],
+        goals=[],
+    )
     session.add(game)
-    session.commit()
-    session.refresh(game)
-    return get_game(game)
+    await session.commit()
+    return FastJSONResponse(game_payload(game))
 
 @router.get("", response_model=list[GameRead])
-def list_games(
+async def list_games(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    session: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """List all games"""
-    statement = select(Game).order_by(Game.date.desc()).offset(skip).limit(limit)
-    games = session.exec(statement).all()
-    return [get_game(game) for game in games]
\ No newline at end of file
+    """List all games, newest first (pass X-Next-Cursor back as `cursor` for the next page)"""
+    order = (Game.date, Game.id)
+    statement = paginate(select(Game.id, Game.date, Game.version), order,
+                         cursor=cursor, skip=skip, limit=limit, descending=True)
+    page = (await session.exec(statement)).all()
+    set_next_cursor(response, page, limit, order)
+    
+    etag = page_etag((row.id, row.version) for row in page)
+    if etag_matches(request, etag):
+        return not_modified(etag, headers=dict(response.headers))
+    set_etag(response, etag)
+    
+    games = {
+        game.id: game
+        for game in await load_games(session, select(Game).where(Game.id.in_([row.id for row in page])))
+    }
+    # Headers set on `response` do not carry over to a returned Response
+    return FastJSONResponse([game_payload(games[row.id]) for row in page if row.id in games],
+                            headers=dict(response.headers))
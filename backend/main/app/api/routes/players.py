@@ -1,60 +1,121 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import Float, case, func, or_, type_coerce
+from sqlalchemy.orm import joinedload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Literal, Optional
 import uuid
 
-from app.models.model import Player
-from app.api.deps import get_db
-from app.models.schema import GamePlayerStats, GlobalPlayerStats, PlayerCreate, PlayerRead, PlayerUpdate, get_gameplayer_stats, get_player_stats
+from app.models.model import Game, Player, PlayerCareerStats
+from app.api.deps import get_db, get_read_db
+from app.api.etag import entity_etag, etag_matches, not_modified, page_etag, set_etag
+from app.api.pagination import paginate, set_next_cursor
+from app.api.responses import FastJSONResponse
+from app.core.cache import game_cache
+from app.models.schema import GamePlayerStats, GlobalPlayerStats, LeaderboardEntry, PlayerCreate, PlayerRead, PlayerUpdate, gameplayer_stats_payload
+from app.models.stats import game_player_ids, leaderboard_statement, player_game_ids, player_games_statement, player_stats_payload, recount_games, refresh_player_stats
+from app.models.versions import bump_versions
 
 router = APIRouter(
     prefix="/api/players",
     tags=["players"],
 )
 
+def _search(name: str, dialect: str):
+    """Match condition and rank of a name search.
+
+    On Postgres both use pg_trgm, so the GIN trigram indexes on name and
+    nickname serve the similarity operator and the ILIKE alike. SQLite has
+    no trigrams: substring matches rank by whether the name starts with the
+    query, which keeps the test suite on the same code path.
+    """
+    pattern = f"%{name}%"
+    matches = or_(Player.name.ilike(pattern), Player.nickname.ilike(pattern))
+    if dialect == "postgresql":
+        matches = or_(matches, Player.name.op("%")(name), Player.nickname.op("%")(name))
+        rank = func.greatest(
+            func.similarity(Player.name, name),
+            func.similarity(func.coalesce(Player.nickname, ""), name),
+        )
+    else:
+        rank = case((Player.name.ilike(f"{name}%"), 1.0), else_=0.5)
+    return matches, type_coerce(rank, Float).label("rank")
+
+
 @router.get("/search/by-name", response_model=list[PlayerRead])
-def search_players_by_name(
+async def search_players_by_name(
     name: str,
-    session: Session = Depends(get_db)
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_db)
+):
+    """Search players by name or nickname, best matches first (pass X-Next-Cursor back as `cursor` for more)"""
+    matches, rank = _search(name, session.bind.dialect.name)
+    order = (rank, Player.id)
+    statement = paginate(
+        select(Player.id, Player.name, Player.nickname, Player.profile, rank).where(matches),
+        order, cursor=cursor, limit=limit, descending=True
+    )
+    rows = (await session.exec(statement)).all()
+    set_next_cursor(response, rows, limit, order)
+    return [PlayerRead.model_validate(row) for row in rows]
+
+
+@router.get("/leaderboard", response_model=list[LeaderboardEntry])
+async def get_leaderboard(
+    metric: Literal["goals", "assists", "wins", "goals_per_game"] = "goals",
+    limit: int = 10,
+    min_games: int = 1,
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """Search players by name (case-insensitive partial match)"""
-    statement = select(Player).where(Player.name.ilike(f"%{name}%"))
-    players = session.exec(statement).all()
-    return [PlayerRead.model_validate(player) for player in players]
+    """Top players by a career metric, ties sharing a rank"""
+    rows = (await session.exec(leaderboard_statement(metric, min_games, limit))).all()
+    return FastJSONResponse([
+        {**player_stats_payload(player, career), "rank": rank}
+        for player, career, rank in rows
+    ])
 
 
 @router.get("/{player_id}/games", response_model=list[GamePlayerStats])
-def get_player_games(
+async def get_player_games(
     player_id: uuid.UUID,
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Get all games a player has participated in"""
-    player = session.get(Player, player_id)
+    player = await session.get(Player, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    games_info = []
-    for gp in player.game_players:
-        
-        games_info.append(get_gameplayer_stats(gp))
-    return games_info
+    rows = (await session.exec(player_games_statement(player_id))).all()
+    return FastJSONResponse([gameplayer_stats_payload(row) for row in rows])
 
 @router.get("/{player_id}", response_model=GlobalPlayerStats)
-def get_player(player_id: uuid.UUID, session: Session = Depends(get_db)):
-    """Get a specific player"""
-    player = session.get(Player, player_id)
+async def get_player(
+    player_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_read_db)
+):
+    """Get a specific player (honours If-None-Match)"""
+    player = await session.get(Player, player_id, options=[joinedload(Player.career_stats)])
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
-    return get_player_stats(player)
+    
+    etag = entity_etag(player.id, player.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return FastJSONResponse(player_stats_payload(player, player.career_stats), headers=dict(response.headers))
 
 @router.put("/{player_id}",  response_model=GlobalPlayerStats)
-def update_player(
+async def update_player(
     player_id: uuid.UUID,
     player_data: PlayerUpdate,
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_db)
 ):
     """Update player info"""
-    player = session.get(Player, player_id)
+    player = await session.get(Player, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
@@ -64,42 +125,69 @@ def update_player(
         player.nickname = player_data.nickname
     
     session.add(player)
-    session.commit()
-    session.refresh(player)
-    return get_player_stats(player)
+    game_ids = await session.run_sync(player_game_ids, player_id)
+    await session.run_sync(bump_versions, Player, [player_id])
+    await session.run_sync(bump_versions, Game, game_ids)
+    await session.commit()
+    game_cache.invalidate(game_ids)
+    await session.refresh(player)
+    return FastJSONResponse(player_stats_payload(player, await session.get(PlayerCareerStats, player_id)))
 
 
 @router.delete("/{player_id}")
-def delete_player(player_id: uuid.UUID, session: Session = Depends(get_db)):
+async def delete_player(player_id: uuid.UUID, session: AsyncSession = Depends(get_db)):
     """Delete a player"""
-    player = session.get(Player, player_id)
+    player = await session.get(Player, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    session.delete(player)
-    session.commit()
+    game_ids = await session.run_sync(player_game_ids, player_id)
+    teammates = await session.run_sync(game_player_ids, game_ids)
+    teammates.discard(player_id)
+    
+    await session.delete(player)
+    await session.run_sync(recount_games, game_ids)
+    await session.run_sync(refresh_player_stats, teammates)
+    await session.run_sync(bump_versions, Game, game_ids)
+    await session.commit()
+    game_cache.invalidate(game_ids)
     return {"message": "Player deleted"}
 
     
 @router.post("", response_model=PlayerRead)
-def create_player(
+async def create_player(
     player_data: PlayerCreate,
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_db)
 ):
     """Create a new player"""
     player = Player(name=player_data.name, nickname=player_data.nickname)
     session.add(player)
-    session.commit()
-    session.refresh(player)
+    await session.commit()
+    await session.refresh(player)
     return player
 
 @router.get("", response_model=list[GlobalPlayerStats])
-def list_players(
+async def list_players(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    session: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """List all players"""
-    statement = select(Player).order_by(Player.name).offset(skip).limit(limit)
-    players = session.exec(statement).all()
-    return [get_player_stats(player) for player in players]
+    """List all players by name (pass X-Next-Cursor back as `cursor` for the next page)"""
+    order = (Player.name, Player.id)
+    statement = paginate(
+        select(Player, PlayerCareerStats).outerjoin(PlayerCareerStats),
+        order, cursor=cursor, skip=skip, limit=limit
+    )
+    rows = (await session.exec(statement)).all()
+    set_next_cursor(response, [player for player, _ in rows], limit, order)
+    
+    etag = page_etag((player.id, player.version) for player, _ in rows)
+    if etag_matches(request, etag):
+        return not_modified(etag, headers=dict(response.headers))
+    set_etag(response, etag)
+    # Headers set on `response` do not carry over to a returned Response
+    return FastJSONResponse([player_stats_payload(player, career) for player, career in rows],
+                            headers=dict(response.headers))
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional
 import uuid
 
-from app.models.model import Stadium
-from app.api.deps import get_db
+from app.models.model import Game, Stadium
+from app.api.deps import get_db, get_read_db
+from app.api.etag import entity_etag, etag_matches, not_modified, page_etag, set_etag
+from app.api.pagination import paginate, set_next_cursor
+from app.core.cache import game_cache
 from app.models.schema import StadiumCreate, StadiumRead
+from app.models.stats import game_player_ids, refresh_player_stats
+from app.models.versions import bump_versions
 
 router = APIRouter(
     prefix="/api/stadiums",
@@ -13,22 +19,32 @@ router = APIRouter(
 )
 
 @router.get("/{stadium_id}", response_model=StadiumRead)
-def get_stadium(stadium_id: uuid.UUID, session: Session = Depends(get_db)):
-    """Get a specific stadium"""
-    stadium = session.get(Stadium, stadium_id)
+async def get_stadium(
+    stadium_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_read_db)
+):
+    """Get a specific stadium (honours If-None-Match)"""
+    stadium = await session.get(Stadium, stadium_id)
     if not stadium:
         raise HTTPException(status_code=404, detail="Stadium not found")
+    
+    etag = entity_etag(stadium.id, stadium.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return StadiumRead.model_validate(stadium)
 
 @router.put("/{stadium_id}", response_model=StadiumRead)
-def update_stadium(
+async def update_stadium(
     stadium_id: uuid.UUID,
     name: Optional[str] = None,
     address: Optional[str] = None,
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_db)
 ):
     """Update stadium info"""
-    stadium = session.get(Stadium, stadium_id)
+    stadium = await session.get(Stadium, stadium_id)
     if not stadium:
         raise HTTPException(status_code=404, detail="Stadium not found")
     
@@ -38,41 +54,59 @@ def update_stadium(
         stadium.address = address
     
     session.add(stadium)
-    session.commit()
-    session.refresh(stadium)
+    game_ids = (await session.exec(select(Game.id).where(Game.stadium_id == stadium_id))).all()
+    await session.run_sync(bump_versions, Stadium, [stadium_id])
+    await session.run_sync(bump_versions, Game, game_ids)
+    await session.commit()
+    game_cache.invalidate(game_ids)
+    await session.refresh(stadium)
     return StadiumRead.model_validate(stadium)
 
 
 @router.delete("/{stadium_id}")
-def delete_stadium(stadium_id: uuid.UUID, session: Session = Depends(get_db)):
+async def delete_stadium(stadium_id: uuid.UUID, session: AsyncSession = Depends(get_db)):
     """Delete a stadium"""
-    stadium = session.get(Stadium, stadium_id)
+    stadium = await session.get(Stadium, stadium_id)
     if not stadium:
         raise HTTPException(status_code=404, detail="Stadium not found")
     
-    session.delete(stadium)
-    session.commit()
+    game_ids = (await session.exec(select(Game.id).where(Game.stadium_id == stadium_id))).all()
+    player_ids = await session.run_sync(game_player_ids, game_ids)
+    await session.delete(stadium)
+    await session.run_sync(refresh_player_stats, player_ids)
+    await session.commit()
+    game_cache.invalidate(game_ids)
     return {"message": "Stadium deleted"}
 
 @router.post("", response_model=StadiumRead)
-def create_stadium(
+async def create_stadium(
     stadium_data: StadiumCreate,
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_db)
 ):
     """Create a new stadium"""
     stadium = Stadium(name=stadium_data.name, address=stadium_data.address)
     session.add(stadium)
-    session.commit()
-    session.refresh(stadium)
+    await session.commit()
+    await session.refresh(stadium)
     return StadiumRead.model_validate(stadium)
 
 @router.get("", response_model=list[StadiumRead])
-def list_stadiums(
+async def list_stadiums(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    session: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """List all stadiums"""
-    statement = select(Stadium).order_by(Stadium.name).offset(skip).limit(limit)
-    stadiums = session.exec(statement).all()
+    """List all stadiums by name (pass X-Next-Cursor back as `cursor` for the next page)"""
+    order = (Stadium.name, Stadium.id)
+    statement = paginate(select(Stadium), order, cursor=cursor, skip=skip, limit=limit)
+    stadiums = (await session.exec(statement)).all()
+    set_next_cursor(response, stadiums, limit, order)
+    
+    etag = page_etag((stadium.id, stadium.version) for stadium in stadiums)
+    if etag_matches(request, etag):
+        return not_modified(etag, headers=dict(response.headers))
+    set_etag(response, etag)
     return [StadiumRead.model_validate(stadium) for stadium in stadiums]
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Check that no route reads a large table in full.
+
+Usage: python -m app.benchmarks.explain [--size small] [--database-url URL]
+
+Every benchmarked route is called once against a seeded database while its
+SQL statements are recorded; each statement is then run through the
+planner (EXPLAIN QUERY PLAN on SQLite, EXPLAIN (FORMAT JSON) on Postgres)
+and full scans of the large tables are reported. The exit status is 1 when
+any is found, so the check can gate CI.
+
+Postgres rightly prefers sequential scans on small tables: run it there
+with --size medium or larger for meaningful plans.
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import Connection, event
+
+from app.benchmarks.run import ROUTES, Route, call, prepare, seeded_app
+from app.benchmarks.seed import SIZES
+
+# Tables that grow with the archive, one row per game or more
+LARGE_TABLES = {"game", "gameplayer", "goal"}
+
+# Routes that read whole tables by design
+FULL_SCAN_ROUTES = {"export.games"}
+
+
+def _postgres_scans(node: dict[str, Any]) -> list[str]:
+    tables = [node["Relation Name"]] if node["Node Type"] == "Seq Scan" else []
+    for child in node.get("Plans", []):
+        tables += _postgres_scans(child)
+    return tables
+
+
+def full_scans(connection: Connection, statement: str, parameters: Any) -> list[str]:
+    """Tables the planner would read in full to run the statement"""
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        if connection.dialect.name == "postgresql":
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = cursor.fetchone()[0]
+            return _postgres_scans(plan[0]["Plan"])
+
+        # SQLite: "SCAN goal" is a full scan, "SCAN game USING INDEX ..." and
+        # "SEARCH goal USING INDEX ..." are not
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        details = [row[3] for row in cursor.fetchall()]
+        return [detail.split()[1] for detail in details if detail.startswith("SCAN ") and "USING" not in detail]
+    finally:
+        cursor.close()
+
+
+def explain_routes(seeded, routes: list[Route] = ROUTES) -> dict[str, list[dict]]:
+    """Full scans of large tables, by route name (routes without any are left out)"""
+    recorded: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # executemany runs one plan for every parameter set
+        recorded.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(seeded.async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        found = {}
+        with seeded.engine.connect() as connection:
+            for route in routes:
+                if route.name in FULL_SCAN_ROUTES:
+                    continue
+                targets = prepare(seeded.client, route, seeded.targets)
+                recorded.clear()
+                call(seeded.client, route, targets)
+                scans = [
+                    {"table": table, "statement": statement}
+                    for statement, parameters in recorded
+                    for table in full_scans(connection, statement, parameters)
+                    if table in LARGE_TABLES
+                ]
+                if scans:
+                    found[route.name] = scans
+        return found
+    finally:
+        event.remove(seeded.async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=list(SIZES), default="small")
+    parser.add_argument("--database-url", help="scratch database, its tables are recreated")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        spec = SIZES[args.size]
+        with seeded_app(args.size, spec["players"], spec["games"], args.database_url, Path(workdir)) as seeded:
+            found = explain_routes(seeded)
+
+    print(json.dumps(found, indent=2))
+    sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
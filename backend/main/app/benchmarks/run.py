@@ -0,0 +1,334 @@
+"""Benchmark every API route against seeded archives of growing size.
+
+Usage: python -m app.benchmarks.run [--size small --size medium] [--repeat 5]
+                                    [--database-url URL] [--output report.json]
+
+Each size gets a fresh database seeded through the bulk importer (a temporary
+SQLite file unless --database-url points at a scratch Postgres database,
+whose tables are dropped and recreated). Every route is then called
+`repeat` times for latency, plus once more under tracemalloc for peak
+memory, counting the SQL statements it sends. The game cache is cleared
+before each call, so the numbers are those of the database path. Routes
+that consume what they act on (starting a game, deleting a player) get a
+fresh target from their setup before every call, outside the timings.
+
+The JSON report goes to stdout or --output, to be diffed between runs.
+"""
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import logging
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional
+
+import anyio
+from fastapi.testclient import TestClient
+import httpx
+from sqlalchemy import Engine, event, func, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.benchmarks.seed import SIZES, seed_database
+from app.core.timing import instrument_engine
+from app.models.model import Game, GamePlayer, Stadium
+
+
+class Route(NamedTuple):
+    name: str
+    method: str
+    path: str
+    body: Optional[Any] = None
+    # Makes the route's own target before each call, returns extra ids for the path and body
+    setup: Optional[Callable[[TestClient, dict[str, str]], dict[str, str]]] = None
+    # Server-Sent Events: timed up to the first message, then the client hangs up
+    stream: bool = False
+
+
+def _new_player(client: TestClient, targets: dict[str, str]) -> dict[str, str]:
+    return {"new_player_id": client.post("/api/players", json={"name": "Benchmark Player"}).json()["id"]}
+
+
+def _new_stadium(client: TestClient, targets: dict[str, str]) -> dict[str, str]:
+    return {"new_stadium_id": client.post("/api/stadiums", json={"name": "Benchmark Stadium"}).json()["id"]}
+
+
+def _new_game(client: TestClient, targets: dict[str, str]) -> dict[str, str]:
+    game = client.post("/api/games", json={"stadium_id": targets["stadium_id"], "date": "2030-01-01T20:00:00"})
+    return {"new_game_id": game.json()["id"]}
+
+
+def _started_game(client: TestClient, targets: dict[str, str]) -> dict[str, str]:
+    extra = _new_game(client, targets)
+    client.put(f"/api/games/{extra['new_game_id']}/start")
+    return extra
+
+
+def _new_goal(client: TestClient, targets: dict[str, str]) -> dict[str, str]:
+    game_id = targets["live_game_id"]
+    client.post(f"/api/games/{game_id}/goals", json={"team_id": targets["live_home_team_id"],
+                                                     "scorer_id": targets["player_id"]})
+    return {"goal_id": client.get(f"/api/games/{game_id}").json()["goals"][-1]["id"]}
+
+
+# Paths and bodies are formatted with the ids picked by pick_targets() and made by setups
+ROUTES = [
+    Route("games.list", "GET", "/api/games"),
+    Route("games.get", "GET", "/api/games/{game_id}"),
+    Route("games.create", "POST", "/api/games", {"stadium_id": "{stadium_id}", "date": "2030-01-01T20:00:00"}),
+    Route("games.add_player", "POST", "/api/games/{live_game_id}/players",
+          {"player_id": "{new_player_id}", "team_id": "{live_home_team_id}"}, setup=_new_player),
+    Route("games.add_players", "POST", "/api/games/{live_game_id}/players:batch",
+          [{"player_id": "{new_player_id}", "team_id": "{live_home_team_id}"}], setup=_new_player),
+    Route("games.add_goal", "POST", "/api/games/{live_game_id}/goals",
+          {"team_id": "{live_home_team_id}", "scorer_id": "{player_id}"}),
+    Route("games.add_goals", "POST", "/api/games/{live_game_id}/goals:batch",
+          [{"team_id": "{live_home_team_id}", "scorer_id": "{player_id}"}] * 3),
+    Route("games.delete_goal", "DELETE", "/api/games/{live_game_id}/goals/{goal_id}", setup=_new_goal),
+    Route("games.start", "PUT", "/api/games/{new_game_id}/start", setup=_new_game),
+    Route("games.end", "PUT", "/api/games/{new_game_id}/end", setup=_started_game),
+    Route("games.events", "GET", "/api/games/{live_game_id}/events", stream=True),
+    Route("games.delete", "DELETE", "/api/games/{new_game_id}", setup=_new_game),
+    Route("players.list", "GET", "/api/players"),
+    Route("players.get", "GET", "/api/players/{player_id}"),
+    Route("players.games", "GET", "/api/players/{player_id}/games"),
+    Route("players.search", "GET", "/api/players/search/by-name?name=Player 000"),
+    Route("players.leaderboard", "GET", "/api/players/leaderboard?metric=goals_per_game&min_games=5"),
+    Route("players.create", "POST", "/api/players", {"name": "Benchmark Player"}),
+    Route("players.update", "PUT", "/api/players/{player_id}", {"nickname": "Benchmark"}),
+    Route("players.delete", "DELETE", "/api/players/{new_player_id}", setup=_new_player),
+    Route("stadiums.list", "GET", "/api/stadiums"),
+    Route("stadiums.get", "GET", "/api/stadiums/{stadium_id}"),
+    Route("stadiums.create", "POST", "/api/stadiums", {"name": "Benchmark Stadium"}),
+    Route("stadiums.update", "PUT", "/api/stadiums/{stadium_id}?address=Benchmark"),
+    Route("stadiums.delete", "DELETE", "/api/stadiums/{new_stadium_id}", setup=_new_stadium),
+    Route("export.games", "GET", "/api/export/games.ndjson"),
+]
+
+
+def pick_targets(session: Session) -> dict[str, str]:
+    """Ids the routes run against: the busiest player, an ended and a live game"""
+    player_id = session.exec(
+        select(GamePlayer.player_id).group_by(GamePlayer.player_id)
+        .order_by(func.count(GamePlayer.id).desc()).limit(1)
+    ).one()
+    game = session.exec(select(Game).where(Game.ended_at.is_not(None)).order_by(Game.date.desc()).limit(1)).one()
+    live_game = session.exec(select(Game).where(Game.started_at.is_(None)).limit(1)).one()
+    stadium_id = session.exec(select(Stadium.id).limit(1)).one()
+    return {
+        "player_id": str(player_id),
+        "game_id": str(game.id),
+        "live_game_id": str(live_game.id),
+        "live_home_team_id": str(live_game.home_team_id),
+        "stadium_id": str(stadium_id),
+    }
+
+
+def _format(value: Any, targets: dict[str, str]) -> Any:
+    if isinstance(value, dict):
+        return {key: _format(item, targets) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_format(item, targets) for item in value]
+    return value.format(**targets) if isinstance(value, str) else value
+
+
+def prepare(client: TestClient, route: Route, targets: dict[str, str]) -> dict[str, str]:
+    """Targets for one call to `route`, after running its setup"""
+    return {**targets, **route.setup(client, targets)} if route.setup else targets
+
+
+async def _first_message(app, path: str) -> httpx.Response:
+    """GET a streaming route and disconnect once its first chunk arrives"""
+    sent: list[dict] = []
+    requested, first_chunk = anyio.Event(), anyio.Event()
+
+    async def receive():
+        if not requested.is_set():
+            requested.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await first_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body":
+            first_chunk.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"testserver")], "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    return httpx.Response(
+        sent[0]["status"],
+        content=b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body"),
+    )
+
+
+def call(client: TestClient, route: Route, targets: dict[str, str]):
+    """One request to `route`, bypassing the game cache"""
+    from app.core.cache import game_cache
+
+    game_cache.clear()
+    path = route.path.format(**targets)
+    if route.stream:
+        # A blocking portal per call, like the test client's own requests
+        with anyio.from_thread.start_blocking_portal() as portal:
+            return portal.call(_first_message, client.app, path)
+    return client.request(route.method, path, json=_format(route.body, targets))
+
+
+def measure(client: TestClient, route: Route, targets: dict[str, str], repeat: int, statements: list) -> dict:
+    def call_route():
+        call_targets = prepare(client, route, targets)
+        statements.clear()
+        start = time.perf_counter()
+        response = call(client, route, call_targets)
+        return response, (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(repeat):
+        response, elapsed = call_route()
+        timings.append(elapsed)
+
+    # Separate pass: tracing allocations would distort the timings
+    tracemalloc.start()
+    response, _ = call_route()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "status": response.status_code,
+        "bytes": len(response.content),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(sorted(timings)[max(0, round(0.95 * len(timings)) - 1)], 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "queries": len(statements),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _engines(database_url: Optional[str], workdir: Path, size: str):
+    url = make_url(database_url or f"sqlite:///{workdir / f'{size}.db'}")
+    sync_engine = create_engine(url)
+    if url.get_backend_name() == "sqlite":
+        async_engine = create_async_engine(url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
+    else:
+        async_engine = create_async_engine(url)
+    instrument_engine(async_engine.sync_engine)
+    SQLModel.metadata.drop_all(sync_engine)
+    SQLModel.metadata.create_all(sync_engine)
+    return sync_engine, async_engine
+
+
+class SeededApp(NamedTuple):
+    client: TestClient
+    engine: Engine  # Sync engine on the same database, for inspection
+    async_engine: AsyncEngine  # Serves the API
+    targets: dict[str, str]
+    counts: dict[str, int]
+    seed_seconds: float
+
+
+@contextmanager
+def seeded_app(size: str, players: int, games: int, database_url: Optional[str], workdir: Path):
+    """The API served from a freshly seeded database"""
+    from app.main import app
+    from app.api.deps import get_db, get_read_db
+
+    sync_engine, async_engine = _engines(database_url, workdir, size)
+    with Session(sync_engine) as session:
+        start = time.perf_counter()
+        counts = seed_database(session, players, games)
+        seed_seconds = time.perf_counter() - start
+        targets = pick_targets(session)
+
+    async def get_benchmark_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_benchmark_db
+    app.dependency_overrides[get_read_db] = get_benchmark_db
+    try:
+        yield SeededApp(TestClient(app), sync_engine, async_engine, targets, counts, seed_seconds)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
+        sync_engine.dispose()
+        async_engine.sync_engine.dispose()
+
+
+def run_size(size: str, players: int, games: int, repeat: int,
+             database_url: Optional[str], workdir: Path, routes: list[Route] = ROUTES) -> dict:
+    with seeded_app(size, players, games, database_url, workdir) as seeded:
+        statements: list[str] = []
+        event.listen(seeded.async_engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        results = {
+            route.name: measure(seeded.client, route, seeded.targets, repeat, statements)
+            for route in routes
+        }
+
+    return {
+        "players": players,
+        "games": games,
+        "seeded": seeded.counts,
+        "seed_seconds": round(seeded.seed_seconds, 2),
+        "routes": results,
+    }
+
+
+def run(sizes: dict[str, dict], repeat: int = 5, database_url: Optional[str] = None,
+        routes: list[Route] = ROUTES) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {
+            size: run_size(size, spec["players"], spec["games"], repeat, database_url, Path(workdir), routes)
+            for size, spec in sizes.items()
+        }
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "database": make_url(database_url).get_backend_name() if database_url else "sqlite",
+        "repeat": repeat,
+        "sizes": results,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", action="append", choices=list(SIZES),
+                        help="dataset size, repeatable (default: small)")
+    parser.add_argument("--players", type=int, help="custom size: number of players")
+    parser.add_argument("--games", type=int, help="custom size: number of games")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="scratch database, its tables are recreated")
+    parser.add_argument("--route", action="append", help="only run routes starting with this name")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    # The test client logs every request, which would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    sizes = {size: SIZES[size] for size in args.size or []}
+    if args.players or args.games:
+        sizes["custom"] = {"players": args.players or 100, "games": args.games or 1_000}
+    routes = [r for r in ROUTES if not args.route or any(r.name.startswith(p) for p in args.route)]
+
+    report = run(sizes or {"small": SIZES["small"]}, args.repeat, args.database_url, routes)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
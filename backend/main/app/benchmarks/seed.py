@@ -0,0 +1,68 @@
+"""Deterministic synthetic archives for the benchmark suite"""
+from datetime import datetime, timedelta
+import random
+
+from sqlmodel import Session
+
+from app.commands.import_games import ImportedGame, ImportedGoal, import_games
+
+# Players / games per named dataset size
+SIZES = {
+    "tiny": {"players": 20, "games": 50},
+    "small": {"players": 100, "games": 1_000},
+    "medium": {"players": 1_000, "games": 10_000},
+    "large": {"players": 10_000, "games": 100_000},
+}
+
+# Games at the end of the archive left unplayed, for the write routes
+LIVE_GAMES = 5
+
+
+def build_games(players: int, games: int, seed: int = 0) -> list[ImportedGame]:
+    """A season archive of 5v5 games with realistic goal counts.
+
+    Every game draws two lineups of five from the player pool and 0-12
+    goals (about six on average), most of them assisted by a teammate.
+    """
+    if players < 2:
+        raise ValueError("Need at least two players to fill both teams")
+    rng = random.Random(seed)
+    names = [f"Player {i:05d}" for i in range(players)]
+    stadiums = [f"Stadium {i:03d}" for i in range(max(1, games // 500))]
+    start = datetime(2020, 1, 1, 20, 0)
+
+    archive = []
+    for i in range(games):
+        lineup = rng.sample(names, min(10, players))
+        sides = {"home": lineup[:len(lineup) // 2], "away": lineup[len(lineup) // 2:]}
+        date = start + timedelta(hours=i)
+        played = i < games - LIVE_GAMES
+
+        goals = []
+        for minute in sorted(rng.sample(range(50), rng.randint(0, 6) + rng.randint(0, 6)) if played else []):
+            team = rng.choice(["home", "away"])
+            scorer, assister = rng.sample(sides[team], 2) if len(sides[team]) > 1 else (sides[team][0], None)
+            goals.append(ImportedGoal(
+                team=team,
+                scorer=scorer,
+                assister=assister if rng.random() < 0.6 else None,
+                minute=date + timedelta(minutes=minute),
+            ))
+
+        archive.append(ImportedGame(
+            date=date,
+            stadium=rng.choice(stadiums),
+            started_at=date if played else None,
+            ended_at=date + timedelta(minutes=50) if played else None,
+            home=sides["home"],
+            away=sides["away"],
+            goals=goals,
+        ))
+    return archive
+
+
+def seed_database(session: Session, players: int, games: int, seed: int = 0) -> dict[str, int]:
+    """Load a synthetic archive through the bulk importer and commit it"""
+    counts = import_games(session, build_games(players, games, seed))
+    session.commit()
+    return counts
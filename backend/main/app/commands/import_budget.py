@@ -0,0 +1,84 @@
+"""Report how long `import app.main` takes and fail when it exceeds a budget.
+
+Usage: python -m app.commands.import_budget [--budget-ms 1500] [--top 15]
+
+Runs the import in a fresh interpreter with -X importtime and prints a JSON
+report (total, budget, packages by own import time, every app.* module) so
+cold-start regressions can be tracked between builds.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Optional
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+
+def parse_importtime(output: str) -> list[dict]:
+    """Parse `-X importtime` stderr into {module, depth, self_ms, cumulative_ms} rows"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        module = parts[2].rstrip()
+        rows.append({
+            "module": module.strip(),
+            "depth": (len(module) - len(module.lstrip(" ")) - 1) // 2,
+            "self_ms": int(parts[0]) / 1000,
+            "cumulative_ms": int(parts[1]) / 1000,
+        })
+    return rows
+
+
+def build_report(rows: list[dict], target: str, budget_ms: float, top: int) -> dict:
+    total = next((row["cumulative_ms"] for row in rows if row["module"] == target), None)
+    packages: dict[str, float] = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + row["self_ms"]
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    return {
+        "module": target,
+        "total_ms": total,
+        "budget_ms": budget_ms,
+        "over_budget": total is None or total > budget_ms,
+        "slowest_packages": [
+            {"package": package, "self_ms": round(self_ms, 3)}
+            for package, self_ms in slowest
+        ],
+        "app_modules": [
+            {"module": row["module"], "self_ms": row["self_ms"], "cumulative_ms": row["cumulative_ms"]}
+            for row in rows if row["module"].startswith("app.")
+        ],
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        return result.returncode
+
+    report = build_report(parse_importtime(result.stderr), args.module, args.budget_ms, args.top)
+    print(json.dumps(report, indent=2))
+    return 1 if report["over_budget"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
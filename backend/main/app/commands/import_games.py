@@ -0,0 +1,228 @@
+"""Bulk-load historical games (lineups and goals included) from a file.
+
+Usage: python -m app.commands.import_games FILE [--format ndjson|csv]
+
+NDJSON: one game per line,
+    {"date": "2024-05-02T20:00:00", "stadium": "Palaghiaccio",
+     "started_at": "2024-05-02T20:05:00", "ended_at": "2024-05-02T21:00:00",
+     "home": ["Rossi", "Bianchi"], "away": ["Verdi"],
+     "goals": [{"team": "home", "scorer": "Rossi", "assister": "Bianchi",
+                "minute": "2024-05-02T20:12:00"}]}
+
+CSV: one lineup entry or goal per row, grouped into games by the `game` key
+(the game's date, stadium, started_at and ended_at are read from its first row),
+    game,date,stadium,started_at,ended_at,kind,team,player,assister,minute
+    g1,2024-05-02T20:00:00,Palaghiaccio,,,lineup,home,Rossi,,
+    g1,2024-05-02T20:00:00,Palaghiaccio,,,goal,home,Rossi,Bianchi,2024-05-02T20:12:00
+
+started_at and ended_at are optional, in either format. A game given neither
+was played already: it is imported as ended, both set to its date, so it is
+cached, cannot be started again and opens no live stream. Give started_at
+alone to import a game still in progress.
+
+Players and stadiums are matched by name and created when missing. A game
+is identified by its date and stadium: games already in the database, or
+listed twice, are skipped, so rerunning an import adds nothing. Every
+other row is inserted in one transaction: on Postgres through COPY,
+elsewhere with executemany INSERTs. Scores, lineup counters and career
+stats are then recomputed set-wise.
+"""
+import argparse
+import csv
+from datetime import datetime
+from typing import Iterable, Literal, Optional, TextIO
+import uuid
+
+from pydantic import BaseModel
+from sqlmodel import Session, select
+
+from app.models.model import Game, GamePlayer, Goal, Player, Stadium, Team
+from app.models.stats import rebuild_player_stats, recount_games
+from app.models.versions import bump_versions
+
+# Keeps IN (...) lists well under the driver's bind parameter limit
+CHUNK_SIZE = 1000
+
+
+class ImportedGoal(BaseModel):
+    team: Literal["home", "away"]
+    scorer: str
+    assister: Optional[str] = None
+    minute: Optional[datetime] = None
+
+
+class ImportedGame(BaseModel):
+    date: datetime
+    stadium: Optional[str] = None
+    started_at: Optional[datetime] = None
+    ended_at: Optional[datetime] = None
+    home: list[str] = []
+    away: list[str] = []
+    goals: list[ImportedGoal] = []
+
+
+def _as_played(game: ImportedGame) -> ImportedGame:
+    """Files hold historical games: over unless they say otherwise"""
+    if game.started_at is None and game.ended_at is None:
+        game.started_at = game.ended_at = game.date
+    elif game.started_at is None:
+        game.started_at = game.date
+    return game
+
+
+def parse_ndjson(lines: Iterable[str]) -> list[ImportedGame]:
+    return [_as_played(ImportedGame.model_validate_json(line)) for line in lines if line.strip()]
+
+
+def parse_csv(file: TextIO) -> list[ImportedGame]:
+    games: dict[str, ImportedGame] = {}
+    for row in csv.DictReader(file):
+        game = games.get(row["game"])
+        if game is None:
+            game = games[row["game"]] = ImportedGame(
+                date=row["date"],
+                stadium=row.get("stadium") or None,
+                started_at=row.get("started_at") or None,
+                ended_at=row.get("ended_at") or None,
+            )
+        if row["kind"] == "lineup":
+            (game.home if row["team"] == "home" else game.away).append(row["player"])
+        elif row["kind"] == "goal":
+            game.goals.append(ImportedGoal(
+                team=row["team"],
+                scorer=row["player"],
+                assister=row.get("assister") or None,
+                minute=row.get("minute") or None,
+            ))
+        else:
+            raise ValueError(f"Unknown row kind {row['kind']!r} in game {row['game']!r}")
+    return [_as_played(game) for game in games.values()]
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def resolve_names(session: Session, model, names: Iterable[str]) -> dict[str, uuid.UUID]:
+    """Map names to ids, inserting the missing rows (the lowest id wins on duplicates, so reruns agree)"""
+    wanted = sorted(set(names))
+    ids: dict[str, uuid.UUID] = {}
+    for chunk in _chunks(wanted):
+        for id, name in session.exec(select(model.id, model.name).where(model.name.in_(chunk)).order_by(model.id)):
+            ids.setdefault(name, id)
+
+    missing = [{"id": uuid.uuid4(), "name": name} for name in wanted if name not in ids]
+    write_rows(session, model, ["id", "name"], [(row["id"], row["name"]) for row in missing])
+    ids.update({row["name"]: row["id"] for row in missing})
+    return ids
+
+
+def existing_games(session: Session, games: list[ImportedGame]) -> set[tuple]:
+    """(date, stadium_id) of the stored games played on any of the games' dates"""
+    found = set()
+    for chunk in _chunks(sorted({game.date for game in games})):
+        found.update(tuple(row) for row in session.exec(select(Game.date, Game.stadium_id).where(Game.date.in_(chunk))))
+    return found
+
+
+def write_rows(session: Session, model, columns: list[str], rows: list[tuple]) -> None:
+    """Insert rows into a model's table: COPY on Postgres, executemany elsewhere"""
+    if not rows:
+        return
+
+    table = model.__table__
+    if session.get_bind().dialect.name != "postgresql":
+        session.connection().execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+        return
+
+    # Server defaults are not applied by COPY, fill in the omitted counters
+    defaults = {name: column.default.arg for name, column in table.columns.items()
+                if name not in columns and column.default is not None and not callable(column.default.arg)}
+    columns = columns + list(defaults)
+    with session.connection().connection.driver_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row + tuple(defaults.values()))
+
+
+def import_games(session: Session, games: list[ImportedGame]) -> dict[str, int]:
+    """Insert the games with their teams, lineups and goals; the caller commits"""
+    stadium_ids = resolve_names(session, Stadium, (game.stadium for game in games if game.stadium))
+
+    # Checked up front: COPY has no ON CONFLICT, and a game has no natural
+    # key a constraint could catch
+    seen, new_games = existing_games(session, games), []
+    for game in games:
+        key = (game.date, stadium_ids.get(game.stadium))
+        if key not in seen:
+            seen.add(key)
+            new_games.append(game)
+    skipped, games = len(games) - len(new_games), new_games
+
+    player_ids = resolve_names(session, Player, (
+        name
+        for game in games
+        for name in [*game.home, *game.away, *(g.scorer for g in game.goals),
+                     *(g.assister for g in game.goals if g.assister)]
+    ))
+
+    teams, game_rows, lineup_rows, goal_rows = [], [], [], []
+    for game in games:
+        game_id, team_ids = uuid.uuid4(), {"home": uuid.uuid4(), "away": uuid.uuid4()}
+        teams += [(team_ids["home"],), (team_ids["away"],)]
+        game_rows.append((
+            game_id, stadium_ids.get(game.stadium), team_ids["home"], team_ids["away"],
+            game.date, game.started_at, game.ended_at,
+        ))
+        for side, names in [("home", game.home), ("away", game.away)]:
+            lineup_rows += [(uuid.uuid4(), game_id, player_ids[name], team_ids[side]) for name in dict.fromkeys(names)]
+        goal_rows += [
+            (uuid.uuid4(), game_id, team_ids[goal.team], player_ids[goal.scorer],
+             player_ids.get(goal.assister), goal.minute)
+            for goal in game.goals
+        ]
+
+    write_rows(session, Team, ["id"], teams)
+    write_rows(session, Game, ["id", "stadium_id", "home_team_id", "away_team_id",
+                               "date", "started_at", "ended_at"], game_rows)
+    write_rows(session, GamePlayer, ["id", "game_id", "player_id", "team_id"], lineup_rows)
+    write_rows(session, Goal, ["id", "game_id", "team_id", "scorer_id", "assister_id", "minute"], goal_rows)
+
+    for chunk in _chunks([row[0] for row in game_rows]):
+        recount_games(session, chunk)
+    rebuild_player_stats(session)
+    # Their career stats changed: stale ETags would keep serving the old ones
+    for chunk in _chunks(list(set(player_ids.values()))):
+        bump_versions(session, Player, chunk)
+    return {
+        "games": len(game_rows),
+        "appearances": len(lineup_rows),
+        "goals": len(goal_rows),
+        "stadiums": len(stadium_ids),
+        "players": len(player_ids),
+        "skipped": skipped,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    from app.core.db import engine
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=["ndjson", "csv"])
+    args = parser.parse_args(argv)
+
+    file_format = args.format or ("csv" if args.file.endswith(".csv") else "ndjson")
+    with open(args.file, newline="", encoding="utf-8") as file:
+        games = parse_csv(file) if file_format == "csv" else parse_ndjson(file)
+
+    with Session(engine) as session:
+        print(f"Importing {len(games)} games...")
+        counts = import_games(session, games)
+        session.commit()
+    print("Imported " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
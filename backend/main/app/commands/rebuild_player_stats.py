@@ -0,0 +1,20 @@
+"""Recompute the playercareerstats table from goal/gameplayer.
+
+Usage: python -m app.commands.rebuild_player_stats
+"""
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.models.stats import rebuild_player_stats
+
+
+def main() -> None:
+    with Session(engine) as session:
+        print("Rebuilding player career stats...")
+        count = rebuild_player_stats(session)
+        session.commit()
+    print(f"Career stats rebuilt for {count} players")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+import time
+from typing import Any, Hashable, Iterable, Optional
+
+from app.core.config import app_settings
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Lives in one process and is only touched from the event loop, so there
+    is no locking. Other processes (uvicorn workers, Lambda containers) keep
+    their own copy: writes handled elsewhere are picked up when the entry
+    expires, which is why the TTL should stay short.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Serialized GameRead JSON of ended games, keyed by game id
+game_cache = TTLCache(maxsize=app_settings.GAME_CACHE_SIZE, ttl=app_settings.GAME_CACHE_TTL)
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 
 class PostgresSettings(BaseSettings):
@@ -7,4 +9,41 @@ class PostgresSettings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
 
+    # Connection pooling, see app.core.db.engine_options():
+    # - "default":  long-lived server, SQLAlchemy's standard queue pool
+    # - "lambda":   one frozen/thawed container per request, a single pre-pinged
+    #               connection recycled before the server drops it
+    # - "external": a pooler (RDS Proxy, PgBouncer) owns the connections, no pool
+    POSTGRES_POOL_PROFILE: Literal["default", "lambda", "external"] = "default"
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: int = 30
+    POSTGRES_POOL_RECYCLE: int = 300
+
+    # Read replica (same port, database and credentials) for the read-only
+    # routes, see app.api.deps.get_read_db(). After a write, the client's
+    # reads stay on the primary for POSTGRES_READ_AFTER_WRITE seconds so it
+    # does not read back stale data while the replica catches up.
+    POSTGRES_REPLICA_SERVER: Optional[str] = None
+    POSTGRES_READ_AFTER_WRITE: int = 10
+
+class AppSettings(BaseSettings):
+    LOGGING_CONFIG: str = "/logging/logging.yaml"
+    # Fast-start mode (Lambda): the schema is owned by Alembic migrations, so
+    # startup skips create_all() and its catalog round trips
+    FAST_START: bool = False
+    # In-process cache of ended games (entries, seconds), see app.core.cache
+    GAME_CACHE_SIZE: int = 512
+    GAME_CACHE_TTL: int = 300
+    # Live game events (SSE), see app.core.events: "memory" for a single
+    # process, "postgres" to fan out through LISTEN/NOTIFY across instances
+    EVENTS_BACKEND: Literal["memory", "postgres"] = "memory"
+    # Per-request SQL figures in a Server-Timing header, see app.core.timing
+    SERVER_TIMING: bool = True
+    # Request metrics (see app.core.metrics) are served at /metrics; on Lambda,
+    # where nothing can scrape a container, log them as CloudWatch EMF instead
+    METRICS_EMF: bool = False
+    METRICS_NAMESPACE: str = "IglooHub"
+
 settings = PostgresSettings()
+app_settings = AppSettings()
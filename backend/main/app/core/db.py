@@ -1,16 +1,90 @@
+from typing import Any
+
 from pydantic_core import MultiHostUrl
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel, Session, create_engine, select
-from app.core.config import settings
+from app.core.config import PostgresSettings, settings
+from app.core.metrics import metrics
+from app.core.timing import instrument_engine
 
-DATABASE_URL = str(MultiHostUrl.build(
+def database_url(settings: PostgresSettings, host: str) -> str:
+    return str(MultiHostUrl.build(
             scheme="postgresql+psycopg",
             username=settings.POSTGRES_USER,
             password=settings.POSTGRES_PASSWORD,
-            host=settings.POSTGRES_SERVER,
+            host=host,
             port=settings.POSTGRES_PORT,
             path=settings.POSTGRES_DB,
         ))
-engine = create_engine(DATABASE_URL)
+
+DATABASE_URL = database_url(settings, settings.POSTGRES_SERVER)
+
+def engine_options(settings: PostgresSettings) -> dict[str, Any]:
+    """Keyword arguments for create_engine() matching POSTGRES_POOL_PROFILE"""
+    if settings.POSTGRES_POOL_PROFILE == "external":
+        # The pooler hands out server connections per transaction, so
+        # server-side prepared statements cannot be relied upon
+        return {"poolclass": NullPool, "connect_args": {"prepare_threshold": None}}
+
+    if settings.POSTGRES_POOL_PROFILE == "lambda":
+        # A container serves one request at a time: keep a single connection
+        # across invocations, check it after a thaw and retire it before the
+        # server or a NAT times it out
+        return {
+            "pool_size": 1,
+            "max_overflow": 0,
+            "pool_pre_ping": True,
+            "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+            "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        }
+
+    return {
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+    }
+
+# Sync engine for migrations and commands, async engine (psycopg async) for the API
+engine = create_engine(DATABASE_URL, **engine_options(settings))
+async_engine = create_async_engine(DATABASE_URL, **engine_options(settings))
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+metrics.instrument_pool(async_engine.sync_engine, "primary")
+
+# Read-only routes go here when a replica is configured, see app.api.deps
+replica_engine = None
+if settings.POSTGRES_REPLICA_SERVER:
+    replica_engine = create_async_engine(
+        database_url(settings, settings.POSTGRES_REPLICA_SERVER), **engine_options(settings)
+    )
+    instrument_engine(replica_engine.sync_engine)
+    metrics.instrument_pool(replica_engine.sync_engine, "replica")
+
+def _pool_figures(pool) -> dict[str, Any]:
+    figures: dict[str, Any] = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        figures.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return figures
+
+def pool_status() -> dict[str, Any]:
+    """Snapshot of the API connection pool (and the replica's), for diagnosing connection storms"""
+    status: dict[str, Any] = {"profile": settings.POSTGRES_POOL_PROFILE, **_pool_figures(async_engine.pool)}
+    if replica_engine is not None:
+        status["replica"] = _pool_figures(replica_engine.pool)
+    return status
+
+def pools_by_label() -> dict[str, dict]:
+    """pool_status() figures keyed by the pool label of the metrics"""
+    status = pool_status()
+    replica = status.pop("replica", None)
+    return {"primary": status, **({"replica": replica} if replica else {})}
 
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
@@ -0,0 +1,192 @@
+import asyncio
+from contextlib import asynccontextmanager
+import json
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import event as sa_event, func, select
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import app_settings
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY rejects larger payloads, and would abort the transaction doing so
+PG_NOTIFY_MAX_BYTES = 8000
+
+# session.info key of the events waiting for the session to commit
+_PENDING = "game_events"
+
+
+class EventBroker:
+    """Fan-out of game events to the SSE streams open in this process.
+
+    Subscribers get a bounded queue per channel (a game id). Events are
+    published inside the transaction making the change and only go out if
+    it commits. The in-memory backend delivers them straight back to this
+    broker once the session commits. The Postgres one runs NOTIFY on the
+    session's own connection, which Postgres sends at commit to every
+    instance's listener, so spectators on another worker or container see
+    it too. Like the game cache, it is only touched from the event loop.
+
+    The backend is started by the first subscriber, so processes that
+    never stream (Lambda runs without lifespan events) hold no listener.
+    """
+
+    def __init__(self, backend: Optional["MemoryBackend"] = None, queue_size: int = 100):
+        self.backend = backend or MemoryBackend()
+        self.backend.broker = self
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._started = False
+
+    async def start(self) -> None:
+        if not self._started:
+            self._started = True
+            await self.backend.start()
+
+    async def stop(self) -> None:
+        if self._started:
+            self._started = False
+            await self.backend.stop()
+
+    async def publish(self, session: AsyncSession, channel: Any, type: str, data: dict) -> None:
+        """Send an event to every subscriber of `channel` when `session` commits"""
+        await self.backend.publish(session, str(channel), {"type": type, "data": data})
+
+    def deliver(self, channel: str, event: dict) -> None:
+        for queue in self._subscribers.get(channel, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client loses events rather than holding memory
+                logger.warning("Dropping %s event for a slow subscriber on %s", event["type"], channel)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: Any) -> AsyncIterator[asyncio.Queue]:
+        await self.start()
+        channel = str(channel)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[channel].discard(queue)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    def subscriber_count(self, channel: Any) -> int:
+        return len(self._subscribers.get(str(channel), ()))
+
+
+class MemoryBackend:
+    """Single-process backend: events are delivered when the session commits"""
+
+    broker: EventBroker
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, session: AsyncSession, channel: str, event: dict) -> None:
+        session.info.setdefault(_PENDING, []).append((self.broker, channel, event))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _deliver_pending(session: Session) -> None:
+    for broker, channel, event in session.info.pop(_PENDING, ()):
+        broker.deliver(channel, event)
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
+
+
+class PostgresBackend(MemoryBackend):
+    """Multi-instance backend over Postgres LISTEN/NOTIFY.
+
+    Each process keeps one dedicated autocommit connection LISTENing on
+    `pg_channel` and delivers what it receives locally; publishing is a
+    pg_notify() on the publishing session's connection, so it needs no
+    second connection from the pool (Lambda runs with a pool of one).
+    NOTIFY payloads are capped at 8000 bytes, so events should stay small
+    deltas; larger ones are logged and dropped.
+    """
+
+    def __init__(self, dsn: str, pg_channel: str = "game_events"):
+        self.dsn = dsn
+        self.pg_channel = pg_channel
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+
+    async def publish(self, session: AsyncSession, channel: str, event: dict) -> None:
+        payload = json.dumps({"channel": channel, "event": event}, default=str)
+        if len(payload.encode()) >= PG_NOTIFY_MAX_BYTES:
+            logger.warning("Dropping %s event on %s, too large for NOTIFY", event["type"], channel)
+            return
+        await session.exec(select(func.pg_notify(self.pg_channel, payload)))
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as connection:
+                    await connection.execute(f"LISTEN {self.pg_channel}")
+                    async for notify in connection.notifies():
+                        message = json.loads(notify.payload)
+                        self.broker.deliver(message["channel"], message["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event listener lost its connection, reconnecting")
+                await asyncio.sleep(1)
+
+
+def sse_message(event: dict) -> str:
+    """Format an event for a text/event-stream response"""
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+async def sse_stream(broker: EventBroker, channel: Any, keepalive: float = 15) -> AsyncIterator[str]:
+    """Yield SSE messages for `channel` until the game ends or the client goes away.
+
+    A comment line is sent every `keepalive` seconds without events, so
+    proxies do not close an idle connection.
+    """
+    async with broker.subscribe(channel) as queue:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield sse_message(event)
+            if event["type"] == "status" and event["data"].get("status") == "ended":
+                return
+
+
+def _backend():
+    if app_settings.EVENTS_BACKEND == "postgres":
+        from app.core.db import DATABASE_URL
+        return PostgresBackend(DATABASE_URL.replace("postgresql+psycopg://", "postgresql://", 1))
+    return MemoryBackend()
+
+
+# Live events of running games, keyed by game id
+game_events = EventBroker(_backend())
@@ -0,0 +1,15 @@
+import logging
+import os
+from logging.config import dictConfig
+
+
+def configure_logging(path: str) -> None:
+    """Apply the shared logging.yaml, parsed with libyaml when it is available"""
+    if not os.path.exists(path):
+        logging.warning("Logging config %s not found, using defaults", path)
+        return
+
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r") as f:
+        dictConfig(yaml.load(f, Loader=loader))
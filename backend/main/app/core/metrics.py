@@ -0,0 +1,236 @@
+from bisect import bisect_left
+from collections import defaultdict
+import json
+import logging
+import time
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import game_cache
+from app.core.config import app_settings
+
+emf_logger = logging.getLogger("app.metrics")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Pool waits and connects, up to the default 30s pool timeout
+POOL_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# Caches whose hit ratio is reported, by label
+CACHES = {"game": game_cache}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str) -> Iterable[str]:
+        sep = "," if labels else ""
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class Metrics:
+    """Process-wide request, pool and cache metrics.
+
+    Everything is updated from the event loop (pool events fire in the
+    greenlet of the awaiting request), so plain ints and dicts are enough:
+    the hot path pays a few dictionary updates and no locks. Figures are
+    per process, like the game cache; Prometheus sums the workers, and
+    Lambda containers report through EMF log lines instead.
+    """
+
+    def __init__(self):
+        self.requests: defaultdict[tuple[str, str, int], int] = defaultdict(int)
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.in_flight = 0
+        # By pool label: "primary", and "replica" when one is configured
+        self.pool_checkouts: defaultdict[str, int] = defaultdict(int)
+        self.pool_connects: defaultdict[str, int] = defaultdict(int)
+        self.pool_wait_time: defaultdict[str, Histogram] = defaultdict(lambda: Histogram(POOL_BUCKETS))
+        self.connect_time: defaultdict[str, Histogram] = defaultdict(lambda: Histogram(POOL_BUCKETS))
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        self.requests[method, route, status] += 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[method, route] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def instrument_pool(self, engine: Engine, label: str = "primary") -> None:
+        """Count checkouts and new connections, and time acquiring and opening them.
+
+        Listeners on the engine carry over to the pool engine.dispose()
+        puts in place (for async engines pass .sync_engine), and so does
+        the pool class: Pool.recreate() instantiates type(pool).
+        """
+        def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+            self.pool_checkouts[label] += 1
+
+        def on_do_connect(dialect, connection_record, cargs, cparams) -> None:
+            # Returning None lets the dialect open the connection as usual
+            connection_record.info["connect_started"] = time.perf_counter()
+
+        def on_connect(dbapi_connection, connection_record) -> None:
+            self.pool_connects[label] += 1
+            started = connection_record.info.pop("connect_started", None)
+            if started is not None:
+                self.connect_time[label].observe(time.perf_counter() - started)
+
+        # No pool event fires before a checkout starts waiting, so time
+        # _do_get() itself: queueing for a free connection, or opening one
+        # when the pool may grow, until the wait times out
+        pool_metrics = self
+        pool_class = type(engine.pool)
+
+        class WaitTimedPool(pool_class):
+            def _do_get(self):
+                started = time.perf_counter()
+                try:
+                    return super()._do_get()
+                finally:
+                    pool_metrics.pool_wait_time[label].observe(time.perf_counter() - started)
+
+        # pool_status() reports the pool by its class name
+        WaitTimedPool.__name__ = WaitTimedPool.__qualname__ = pool_class.__name__
+        engine.pool.__class__ = WaitTimedPool
+
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "do_connect", on_do_connect)
+        event.listen(engine, "connect", on_connect)
+
+    def render(self, pools: dict[str, dict]) -> str:
+        """Prometheus text exposition format, `pools` being pool_status() figures by pool label"""
+        lines = [
+            "# HELP http_requests_total Requests handled, by route template and status",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency, by route template",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            lines += histogram.samples("http_request_duration_seconds", f'method="{method}",route="{route}"')
+
+        lines += [
+            "# HELP http_requests_in_flight Requests being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP db_pool_checkouts_total Connections handed out by the pool",
+            "# TYPE db_pool_checkouts_total counter",
+            *(f'db_pool_checkouts_total{{pool="{label}"}} {count}' for label, count in sorted(self.pool_checkouts.items())),
+            "# HELP db_pool_connects_total Database connections opened",
+            "# TYPE db_pool_connects_total counter",
+            *(f'db_pool_connects_total{{pool="{label}"}} {count}' for label, count in sorted(self.pool_connects.items())),
+            "# HELP db_pool_wait_seconds Time checkouts spent acquiring a connection from the pool",
+            "# TYPE db_pool_wait_seconds histogram",
+        ]
+        for label, histogram in sorted(self.pool_wait_time.items()):
+            lines += histogram.samples("db_pool_wait_seconds", f'pool="{label}"')
+        lines += [
+            "# HELP db_connect_seconds Time spent opening database connections",
+            "# TYPE db_connect_seconds histogram",
+        ]
+        for label, histogram in sorted(self.connect_time.items()):
+            lines += histogram.samples("db_connect_seconds", f'pool="{label}"')
+        for key in ("size", "checked_in", "checked_out", "overflow"):
+            samples = [f'db_pool_{key}{{pool="{label}"}} {pool[key]}' for label, pool in pools.items() if key in pool]
+            if samples:
+                lines += [f"# TYPE db_pool_{key} gauge", *samples]
+
+        lines += [
+            "# HELP cache_requests_total Cache lookups, by cache and result",
+            "# TYPE cache_requests_total counter",
+        ]
+        for name, cache in CACHES.items():
+            lines.append(f'cache_requests_total{{cache="{name}",result="hit"}} {cache.hits}')
+            lines.append(f'cache_requests_total{{cache="{name}",result="miss"}} {cache.misses}')
+        lines += ["# HELP cache_hit_ratio Share of lookups served from the cache", "# TYPE cache_hit_ratio gauge"]
+        for name, cache in CACHES.items():
+            lookups = cache.hits + cache.misses
+            lines.append(f'cache_hit_ratio{{cache="{name}"}} {cache.hits / lookups if lookups else 0.0}')
+        return "\n".join(lines) + "\n"
+
+
+def emf_record(method: str, route: str, status: int, seconds: float) -> dict:
+    """One request as a CloudWatch Embedded Metric Format document"""
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": app_settings.METRICS_NAMESPACE,
+                "Dimensions": [["Route"]],
+                "Metrics": [
+                    {"Name": "Requests", "Unit": "Count"},
+                    {"Name": "Errors", "Unit": "Count"},
+                    {"Name": "Latency", "Unit": "Milliseconds"},
+                ],
+            }],
+        },
+        "Route": f"{method} {route}",
+        "Status": status,
+        "Requests": 1,
+        "Errors": int(status >= 500),
+        "Latency": round(seconds * 1000, 2),
+    }
+    for name, cache in CACHES.items():
+        record[f"{name}_hits"] = cache.hits
+        record[f"{name}_misses"] = cache.misses
+    return record
+
+
+class MetricsMiddleware:
+    """Feed every HTTP request into `metrics`, and into EMF log lines when METRICS_EMF is on"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - start
+            metrics.in_flight -= 1
+            # The route template keeps label cardinality bounded, unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            metrics.observe_request(scope["method"], route, status, seconds)
+            if app_settings.METRICS_EMF:
+                emf_logger.info(json.dumps(emf_record(scope["method"], route, status, seconds)))
+
+
+metrics = Metrics()
@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import logging
+import time
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import app_settings
+
+logger = logging.getLogger("app.timing")
+
+
+class RequestStats:
+    """SQL work done on behalf of one request"""
+
+    __slots__ = ("started", "statements", "db_seconds", "lazy_loads")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.lazy_loads = 0
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        db_ms = self.db_seconds * 1000
+        return (
+            f'db;dur={db_ms:.2f};desc="{self.statements} statements", '
+            f'lazy;desc="{self.lazy_loads} lazy loads", '
+            f"app;dur={total_ms - db_ms:.2f}, "
+            f"total;dur={total_ms:.2f}"
+        )
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def collect_stats() -> Iterator[RequestStats]:
+    """Attribute every statement and lazy load run in this context to one RequestStats"""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._timing_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - context._timing_started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements and time spent in the database (for async engines pass .sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _count_lazy_loads(orm_execute_state: ORMExecuteState) -> None:
+    stats = _current.get()
+    if stats is not None and orm_execute_state.is_select and orm_execute_state.lazy_loaded_from is not None:
+        stats.lazy_loads += 1
+
+
+class ServerTimingMiddleware:
+    """Report each request's SQL statements, DB time and lazy loads.
+
+    The figures go out in a Server-Timing header (when SERVER_TIMING is on)
+    and in one JSON log line on the app.timing logger once the response is
+    complete, so N+1-bound requests (many statements, DB-heavy) can be told
+    apart from serialization-bound ones (few statements, app-heavy).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        with collect_stats() as stats:
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if app_settings.SERVER_TIMING:
+                        MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                logger.info(json.dumps({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - stats.started) * 1000, 2),
+                    "db_ms": round(stats.db_seconds * 1000, 2),
+                    "statements": stats.statements,
+                    "lazy_loads": stats.lazy_loads,
+                }))
@@ -1,35 +1,85 @@
-from mangum import Mangum
+import asyncio
 from datetime import datetime
-import os
 import logging
-from logging.config import dictConfig
+import os
+import signal
 from contextlib import asynccontextmanager
 
-import yaml
 from fastapi import FastAPI
-from app.core.db import init_db, reset_db
-from app.api.routes import games, players, stadiums
+from fastapi.responses import PlainTextResponse
+from app.core.config import app_settings
+from app.core.db import async_engine, init_db, pool_status, pools_by_label, replica_engine, reset_db
+from app.core.events import game_events
+from app.core.log_config import configure_logging
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.timing import ServerTimingMiddleware
+from app.api.deps import ReadAfterWriteMiddleware
+from app.api.routes import export, games, players, stadiums
 
-logging_config_path = os.getenv("LOGGING_CONFIG", "/logging/logging.yaml")
-with open(logging_config_path, "r") as f:
-    config = yaml.safe_load(f.read())
-    dictConfig(config)
+configure_logging(app_settings.LOGGING_CONFIG)
+
+async def shutdown():
+    await game_events.stop()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    logging.info("FastAPI shutdown complete")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_db()
+    # The event broker starts with its first SSE subscriber
+    if not app_settings.FAST_START:
+        init_db()
     yield
-    logging.info("FastAPI shutdown complete")
+    await shutdown()
 
 app = FastAPI(docs_url="/docs", openapi_url=f"/docs/openapi.json", lifespan=lifespan)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ReadAfterWriteMiddleware)
 start_time = datetime.now()
 
 app.include_router(games.router)
 app.include_router(players.router)
 app.include_router(stadiums.router)
+app.include_router(export.router)
 
 @app.get("/health")
 async def healthcheck():
-    return {"status": "ok", "uptime_seconds": (datetime.now() - start_time).total_seconds()}
+    return {
+        "status": "ok",
+        "uptime_seconds": (datetime.now() - start_time).total_seconds(),
+        "db_pool": pool_status(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(pools_by_label()), media_type="text/plain; version=0.0.4")
+
+def _shutdown_on_sigterm(signum, frame):
+    # Lambda signals the runtime before stopping the execution environment,
+    # which is normally between invocations, with the event loop idle
+    loop = asyncio.get_event_loop()
+    if not loop.is_running():
+        loop.run_until_complete(shutdown())
+
+def _lambda_handler():
+    from mangum import Mangum
+    if not app_settings.FAST_START:
+        return Mangum(app, lifespan="auto")
+    # Mangum runs the lifespan around every invocation, and its shutdown
+    # would drop the warm connection pool each time: in fast-start mode
+    # there is nothing to start, and shutdown waits for SIGTERM instead
+    signal.signal(signal.SIGTERM, _shutdown_on_sigterm)
+    return Mangum(app, lifespan="off")
+
+# Built during Lambda's init phase, never imported under uvicorn
+_mangum = _lambda_handler() if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else None
 
-handler = Mangum(app)
\ No newline at end of file
+def handler(event, context):
+    """AWS Lambda entry point"""
+    global _mangum
+    if _mangum is None:
+        _mangum = _lambda_handler()
+    return _mangum(event, context)
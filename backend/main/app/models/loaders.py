@@ -0,0 +1,46 @@
+from typing import Optional
+import uuid
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.model import Game, GamePlayer, Goal, Team
+
+# ==========================
+# GAME
+# ==========================
+
+def game_graph_options() -> list:
+    """Loader options for everything get_game() walks.
+
+    Many-to-one hops are joined onto the parent row, collections are
+    fetched with one SELECT ... IN per level, so a game (or a page of games)
+    costs four queries: games, home lineups, away lineups and goals.
+    """
+    return [
+        joinedload(Game.stadium),
+        joinedload(Game.home_team)
+            .selectinload(Team.players)
+            .joinedload(GamePlayer.player),
+        joinedload(Game.away_team)
+            .selectinload(Team.players)
+            .joinedload(GamePlayer.player),
+        selectinload(Game.goals).options(
+            joinedload(Goal.scorer),
+            joinedload(Goal.assister),
+        ),
+    ]
+
+async def load_game(session: AsyncSession, game_id: uuid.UUID) -> Optional[Game]:
+    """Fetch a single game with its full graph, overwriting any stale copy in the session"""
+    statement = (
+        select(Game)
+        .where(Game.id == game_id)
+        .options(*game_graph_options())
+        .execution_options(populate_existing=True)
+    )
+    return (await session.exec(statement)).first()
+
+async def load_games(session: AsyncSession, statement) -> list[Game]:
+    """Run a select(Game) statement, fetching each game's full graph"""
+    return list((await session.exec(statement.options(*game_graph_options()))).all())
@@ -2,6 +2,7 @@ from sqlmodel import Column, SQLModel, Field, Relationship
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING, List
 import uuid
+from sqlalchemy import DDL, Index, UniqueConstraint, event
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 if TYPE_CHECKING:
@@ -16,6 +17,7 @@ class Stadium(SQLModel, table=True):
     )
     name: str = Field(index=True)
     address: Optional[str] = None
+    version: int = 0  # Bumped on every change, see app.models.versions
 
     games: List["Game"] = Relationship(
         back_populates="stadium",
@@ -25,6 +27,18 @@ class Stadium(SQLModel, table=True):
 
 class Player(SQLModel, table=True):
     """Registered players"""
+    # GIN trigram indexes for the player search, Postgres only (needs pg_trgm)
+    __table_args__ = (
+        Index(
+            "ix_player_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_player_nickname_trgm", "nickname",
+            postgresql_using="gin", postgresql_ops={"nickname": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
         sa_column=Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -32,6 +46,7 @@ class Player(SQLModel, table=True):
     name: str = Field(index=True)
     nickname: Optional[str] = None
     profile: Optional[str] = None
+    version: int = 0  # Bumped on every change, including career stats
     
     game_players: List["GamePlayer"] = Relationship(
         back_populates="player",
@@ -50,6 +65,30 @@ class Player(SQLModel, table=True):
             "foreign_keys": "[Goal.assister_id]",
         }
     )
+    career_stats: Optional["PlayerCareerStats"] = Relationship(
+        back_populates="player",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan", "uselist": False}
+    )
+
+
+# create_all() needs the operator class before it can build the indexes above
+event.listen(
+    Player.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class PlayerCareerStats(SQLModel, table=True):
+    """Precomputed career totals, kept in sync by the write routes"""
+    player_id: uuid.UUID = Field(foreign_key="player.id", primary_key=True)
+    games: int = 0
+    goals: int = Field(default=0, index=True)  # Indexed for the leaderboard
+    assists: int = Field(default=0, index=True)
+    wins: int = Field(default=0, index=True)
+    draws: int = 0
+    losses: int = 0
+    
+    player: "Player" = Relationship(back_populates="career_stats")
 
 
 class Team(SQLModel, table=True):
@@ -87,12 +126,16 @@ class Game(SQLModel, table=True):
         default_factory=uuid.uuid4,
         sa_column=Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     )
-    stadium_id: Optional[uuid.UUID] = Field(default=None, foreign_key="stadium.id")
-    home_team_id: uuid.UUID = Field(foreign_key="team.id") 
-    away_team_id: uuid.UUID = Field(foreign_key="team.id") 
+    # Foreign keys are indexed for relationship loads and cascades
+    stadium_id: Optional[uuid.UUID] = Field(default=None, foreign_key="stadium.id", index=True)
+    home_team_id: uuid.UUID = Field(foreign_key="team.id", index=True)
+    away_team_id: uuid.UUID = Field(foreign_key="team.id", index=True)
     date: datetime = Field(index=True)
     started_at: Optional[datetime] = None
     ended_at: Optional[datetime] = None
+    home_score: int = 0
+    away_score: int = 0
+    version: int = 0  # Bumped on every change to the game or its lineups/goals
     
     stadium: Optional["Stadium"] = Relationship(back_populates="games")
     home_team: "Team" = Relationship(
@@ -119,27 +162,22 @@ class Game(SQLModel, table=True):
 
 class GamePlayer(SQLModel, table=True):
     """Links players to games and assigns them to a team"""
+    # One lineup row per player and game: career deltas count each player once
+    __table_args__ = (UniqueConstraint("game_id", "player_id"),)
+    
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
         sa_column=Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     )
-    game_id: uuid.UUID = Field(foreign_key="game.id")
-    player_id: uuid.UUID = Field(foreign_key="player.id")
-    team_id: uuid.UUID = Field(foreign_key="team.id")
+    game_id: uuid.UUID = Field(foreign_key="game.id", index=True)
+    player_id: uuid.UUID = Field(foreign_key="player.id", index=True)
+    team_id: uuid.UUID = Field(foreign_key="team.id", index=True)
+    goals: int = 0  # Goals scored by this player in this game
+    assists: int = 0  # Assists made by this player in this game
     
     player: "Player" = Relationship(back_populates="game_players")
     game: "Game" = Relationship(back_populates="game_players")
     team: "Team" = Relationship(back_populates="players")
-    
-    def get_goals(self) -> int:
-        """Count goals scored by this player in this game"""
-        return len([g for g in self.game.goals 
-                   if g.scorer_id == self.player_id])
-    
-    def get_assists(self) -> int:
-        """Count assists made by this player in this game"""
-        return len([g for g in self.game.goals 
-                   if g.assister_id == self.player_id])
 
 
 class Goal(SQLModel, table=True):
@@ -148,10 +186,10 @@ class Goal(SQLModel, table=True):
         default_factory=uuid.uuid4,
         sa_column=Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     )
-    game_id: uuid.UUID = Field(foreign_key="game.id")
-    team_id: uuid.UUID = Field(foreign_key="team.id")
-    scorer_id: uuid.UUID = Field(foreign_key="player.id")
-    assister_id: Optional[uuid.UUID] = Field(default=None, foreign_key="player.id")
+    game_id: uuid.UUID = Field(foreign_key="game.id", index=True)
+    team_id: uuid.UUID = Field(foreign_key="team.id", index=True)
+    scorer_id: uuid.UUID = Field(foreign_key="player.id", index=True)
+    assister_id: Optional[uuid.UUID] = Field(default=None, foreign_key="player.id", index=True)
     minute: Optional[datetime] = None  # When the goal was scored
     
     scorer: "Player" = Relationship(
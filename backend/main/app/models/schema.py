@@ -1,10 +1,10 @@
 from datetime import datetime
 from typing import Literal, Optional, List
 import uuid
-from pydantic import BaseModel, ConfigDict, computed_field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
 from sqlmodel import Session
 
-from app.models.model import Game, GamePlayer, Player, Team
+from app.models.model import Game, Team
 
 # ==========================
 # PLAYER
@@ -37,36 +37,16 @@ class GlobalPlayerStats(BaseModel):
     total_goals: int
     total_assists: int
     wins: int
+    draws: int = 0
+    losses: int = 0
     
     @computed_field
     @property
     def goals_per_game(self) -> float:
         return round(self.total_goals / self.games_played, 2) if self.games_played > 0 else 0
 
-def get_player_stats(player: Player) -> GlobalPlayerStats:
-    
-    wins = 0
-    for game_player in player.game_players:
-        game = game_player.game
-        player_team_id = game_player.team_id
-        
-        game = get_game(game)
-        
-        if player_team_id == game.home_team.id and game.score.home_team > game.score.away_team:
-            wins += 1
-        elif player_team_id == game.away_team.id and game.score.away_team > game.score.home_team:
-            wins += 1
-    
-    return GlobalPlayerStats(
-        id=player.id,
-        name=player.name,
-        nickname=player.nickname,
-        profile=player.profile,
-        games_played=len(player.game_players),
-        total_goals=len(player.goals_scored),
-        total_assists=len(player.assists_made),
-        wins=wins
-    )
+class LeaderboardEntry(GlobalPlayerStats):
+    rank: int  # Ties share a rank, as with SQL RANK()
 
 class GamePlayerStats(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -80,32 +60,18 @@ class GamePlayerStats(BaseModel):
     goals: int
     assists: int
 
-def get_gameplayer_stats(gp: GamePlayer) -> GamePlayerStats:
-    game = get_game(gp.game)
-    team = "home" if game.home_team.id == gp.team_id else "away"
-    score = game.score
-    
-    player_is_home = game.home_team.id == gp.team_id
-    player_goals = score.home_team if player_is_home else score.away_team
-    opponent_goals = score.away_team if player_is_home else score.home_team
-    
-    if player_goals > opponent_goals:
-        result = "win"
-    elif player_goals < opponent_goals:
-        result = "loss"
-    else:
-        result = "draw"
-    
-    return GamePlayerStats(
-        game_id=game.id, 
-        date=game.date, 
-        stadium=game.stadium.name, 
-        team=team, 
-        score=f"{score.home_team} - {score.away_team}",
-        result=result, 
-        goals=gp.get_goals(), 
-        assists=gp.get_assists()
-    )
+def gameplayer_stats_payload(row) -> dict:
+    """GamePlayerStats as a plain dict, from a row of player_games_statement()"""
+    return {
+        "game_id": row.game_id,
+        "date": row.date,
+        "stadium": row.stadium,
+        "team": row.team,
+        "score": f"{row.home_score} - {row.away_score}",
+        "result": row.result,
+        "goals": row.goals,
+        "assists": row.assists,
+    }
 
 # ==========================
 # STADIUM
@@ -194,6 +160,8 @@ class GameRead(BaseModel):
     home_team: GameTeamRead
     away_team: GameTeamRead
     goals: List[GoalRead] = []
+    # Kept up to date by the goal routes, clients cannot set it
+    score: GameScore = Field(json_schema_extra={"readOnly": True})
 
     @computed_field
     @property
@@ -204,39 +172,55 @@ class GameRead(BaseModel):
             return 'started'
         return 'ended'
     
-    @computed_field
-    @property
-    def score(self) -> GameScore:
-        home_team = sum(1 for goal in self.goals if goal.team_id == self.home_team.id)
-        away_team = sum(1 for goal in self.goals if goal.team_id == self.away_team.id)
-        return GameScore(home_team=home_team, away_team=away_team)
-    
-def get_team(team: Team):
-    game_players = team.players
-    team_players: list[GamePlayerTeamRead] = []
-    for gp in game_players:
-        team_players.append(GamePlayerTeamRead(
-            id = gp.player_id,
-            name = gp.player.name,
-            nickname = gp.player.nickname,
-            profile = gp.player.profile,
-            goals=gp.get_goals(),
-            assists=gp.get_assists()
-        ))
-    return GameTeamRead(
-        id=team.id,
-        name=team.name,
-        players=team_players
-    )
-        
-def get_game(game: Game) -> GlobalPlayerStats:
-    return GameRead(
-        id=game.id,
-        date=game.date,
-        started_at=game.started_at,
-        ended_at=game.ended_at,
-        stadium=StadiumRead.model_validate(game.stadium),
-        home_team=get_team(game.home_team),
-        away_team=get_team(game.away_team),
-        goals=[GoalRead.model_validate(goal) for goal in game.goals]
-    )
\ No newline at end of file
+# The *_payload() builders produce the JSON shape of the matching Read model
+# straight from loaded ORM rows, without validation. Hot read routes encode
+# them directly (see app.api.responses); keep both in step.
+
+def player_payload(player) -> Optional[dict]:
+    if player is None:
+        return None
+    return {"id": player.id, "name": player.name, "nickname": player.nickname, "profile": player.profile}
+
+def team_payload(team: Team) -> dict:
+    return {
+        "id": team.id,
+        "name": team.name,
+        "players": [
+            {**player_payload(gp.player), "goals": gp.goals, "assists": gp.assists}
+            for gp in team.players
+        ],
+    }
+
+def game_payload(game: Game) -> dict:
+    """GameRead as a plain dict"""
+    stadium = game.stadium
+    if not game.started_at:
+        status = "not_started"
+    elif not game.ended_at:
+        status = "started"
+    else:
+        status = "ended"
+    return {
+        "id": game.id,
+        "date": game.date,
+        "started_at": game.started_at,
+        "ended_at": game.ended_at,
+        "stadium": stadium and {"id": stadium.id, "name": stadium.name, "address": stadium.address},
+        "home_team": team_payload(game.home_team),
+        "away_team": team_payload(game.away_team),
+        "goals": [
+            {
+                "id": goal.id,
+                "team_id": goal.team_id,
+                "minute": goal.minute,
+                "scorer": player_payload(goal.scorer),
+                "assister": player_payload(goal.assister),
+            }
+            for goal in game.goals
+        ],
+        "score": {"home_team": game.home_score, "away_team": game.away_score},
+        "status": status,
+    }
+
+def get_game(game: Game) -> GameRead:
+    return GameRead.model_validate(game_payload(game))
\ No newline at end of file
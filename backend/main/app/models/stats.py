@@ -0,0 +1,378 @@
+from typing import Iterable, Optional
+import uuid
+from sqlalchemy import case, delete, func, true, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, select
+
+from app.models.model import Game, GamePlayer, Goal, Player, PlayerCareerStats, Stadium
+from app.models.schema import GlobalPlayerStats
+from app.models.versions import bump_versions
+
+# ==========================
+# PLAYER
+# ==========================
+
+def player_stats_statement(player_ids: Optional[list[uuid.UUID]] = None):
+    """Aggregate career totals for a set of players (all players if None).
+
+    Results are worked out per appearance by comparing the goal count of
+    the player's team against the other team of the same game, so no game
+    ever has to be materialized. Yields one row per player:
+    (player_id, games, wins, draws, losses, goals, assists).
+    """
+    def only(column):
+        return column.in_(player_ids) if player_ids is not None else true()
+
+    played_games = select(GamePlayer.game_id).where(only(GamePlayer.player_id))
+    team_goals = (
+        select(Goal.game_id, Goal.team_id, func.count(Goal.id).label("goals"))
+        .where(Goal.game_id.in_(played_games))
+        .group_by(Goal.game_id, Goal.team_id)
+        .subquery()
+    )
+    goals_for = team_goals.alias("goals_for")
+    goals_against = team_goals.alias("goals_against")
+    opponent_id = case(
+        (GamePlayer.team_id == Game.home_team_id, Game.away_team_id),
+        else_=Game.home_team_id,
+    )
+    scored_for = func.coalesce(goals_for.c.goals, 0)
+    scored_against = func.coalesce(goals_against.c.goals, 0)
+
+    results = (
+        select(
+            GamePlayer.player_id,
+            func.count(GamePlayer.id).label("games"),
+            func.sum(case((scored_for > scored_against, 1), else_=0)).label("wins"),
+            func.sum(case((scored_for == scored_against, 1), else_=0)).label("draws"),
+            func.sum(case((scored_for < scored_against, 1), else_=0)).label("losses"),
+        )
+        .join(Game, Game.id == GamePlayer.game_id)
+        .outerjoin(goals_for, (goals_for.c.game_id == GamePlayer.game_id)
+                   & (goals_for.c.team_id == GamePlayer.team_id))
+        .outerjoin(goals_against, (goals_against.c.game_id == GamePlayer.game_id)
+                   & (goals_against.c.team_id == opponent_id))
+        .where(only(GamePlayer.player_id))
+        .group_by(GamePlayer.player_id)
+        .subquery()
+    )
+    scored = (
+        select(Goal.scorer_id, func.count(Goal.id).label("goals"))
+        .where(only(Goal.scorer_id))
+        .group_by(Goal.scorer_id)
+        .subquery()
+    )
+    assisted = (
+        select(Goal.assister_id, func.count(Goal.id).label("assists"))
+        .where(only(Goal.assister_id))
+        .group_by(Goal.assister_id)
+        .subquery()
+    )
+
+    return (
+        select(
+            Player.id,
+            func.coalesce(results.c.games, 0),
+            func.coalesce(results.c.wins, 0),
+            func.coalesce(results.c.draws, 0),
+            func.coalesce(results.c.losses, 0),
+            func.coalesce(scored.c.goals, 0),
+            func.coalesce(assisted.c.assists, 0),
+        )
+        .outerjoin(results, results.c.player_id == Player.id)
+        .outerjoin(scored, scored.c.scorer_id == Player.id)
+        .outerjoin(assisted, assisted.c.assister_id == Player.id)
+        .where(only(Player.id))
+    )
+
+def leaderboard_statement(metric: str, min_games: int = 1, limit: int = 10):
+    """Top players by a career metric, read from PlayerCareerStats.
+
+    Yields (Player, PlayerCareerStats or None, rank) rows; RANK() runs over
+    the thresholded players so ties share a position. goals/assists/wins
+    are indexed, goals_per_game is derived on the fly.
+    """
+    if metric == "goals_per_game":
+        value = PlayerCareerStats.goals * 1.0 / func.nullif(PlayerCareerStats.games, 0)
+    else:
+        value = getattr(PlayerCareerStats, metric)
+
+    if min_games > 0:
+        # Players without a career row have played no games, so an inner join
+        # loses nobody, and ordering on the bare column lets its index serve it
+        order = value.desc()
+        statement = select(Player, PlayerCareerStats, func.rank().over(order_by=order).label("rank")).join(PlayerCareerStats)
+        statement = statement.where(PlayerCareerStats.games >= min_games)
+    else:
+        order = value.desc().nulls_last()
+        statement = select(Player, PlayerCareerStats, func.rank().over(order_by=order).label("rank")).outerjoin(PlayerCareerStats)
+
+    return statement.order_by(order, Player.name, Player.id).limit(limit)
+
+def game_player_ids(session: Session, game_ids: Iterable[uuid.UUID]) -> set[uuid.UUID]:
+    """Every player whose career totals depend on the given games"""
+    game_ids = list(game_ids)
+    if not game_ids:
+        return set()
+
+    lineups = select(GamePlayer.player_id).where(GamePlayer.game_id.in_(game_ids))
+    goals = select(Goal.scorer_id, Goal.assister_id).where(Goal.game_id.in_(game_ids))
+    player_ids = set(session.exec(lineups).all())
+    for scorer_id, assister_id in session.exec(goals).all():
+        player_ids.update({scorer_id, assister_id})
+    player_ids.discard(None)
+    return player_ids
+
+def player_game_ids(session: Session, player_id: uuid.UUID) -> set[uuid.UUID]:
+    """Every game the player appeared, scored or assisted in"""
+    lineups = select(GamePlayer.game_id).where(GamePlayer.player_id == player_id)
+    goals = select(Goal.game_id).where(
+        (Goal.scorer_id == player_id) | (Goal.assister_id == player_id)
+    )
+    return set(session.exec(lineups).all()) | set(session.exec(goals).all())
+
+def refresh_player_stats(session: Session, player_ids: Iterable[uuid.UUID]) -> None:
+    """Recompute the career rows of the given players inside the current transaction"""
+    player_ids = list(set(player_ids))
+    if not player_ids:
+        return
+
+    existing = {
+        career.player_id: career
+        for career in session.exec(
+            select(PlayerCareerStats).where(PlayerCareerStats.player_id.in_(player_ids))
+        ).all()
+    }
+    for player_id, games, wins, draws, losses, goals, assists in session.exec(
+        player_stats_statement(player_ids)
+    ).all():
+        career = existing.get(player_id) or PlayerCareerStats(player_id=player_id)
+        career.games = games
+        career.wins = wins
+        career.draws = draws
+        career.losses = losses
+        career.goals = goals
+        career.assists = assists
+        session.add(career)
+    bump_versions(session, Player, player_ids)
+
+def _outcome(goals_for: int, goals_against: int) -> str:
+    """Career column a result counts towards"""
+    if goals_for > goals_against:
+        return "wins"
+    return "losses" if goals_for < goals_against else "draws"
+
+def _with_careers(session: Session, player_ids: Iterable[uuid.UUID]) -> set[uuid.UUID]:
+    """The players among `player_ids` that already have a career row.
+
+    The others get theirs computed from scratch, change included, so
+    callers apply their deltas to the returned players only.
+    """
+    player_ids = set(player_ids)
+    player_ids.discard(None)
+    if not player_ids:
+        return set()
+    existing = set(session.exec(
+        select(PlayerCareerStats.player_id).where(PlayerCareerStats.player_id.in_(player_ids))
+    ).all())
+    refresh_player_stats(session, player_ids - existing)
+    return existing
+
+def _adjust_careers(session: Session, player_ids: Iterable[uuid.UUID], **deltas: int) -> None:
+    """Add `deltas` (column name -> amount) to the career rows of the given players"""
+    player_ids = list(player_ids)
+    values = {
+        getattr(PlayerCareerStats, column): getattr(PlayerCareerStats, column) + delta
+        for column, delta in deltas.items() if delta
+    }
+    if player_ids and values:
+        session.exec(
+            update(PlayerCareerStats)
+            .where(PlayerCareerStats.player_id.in_(player_ids))
+            .values(values)
+        )
+
+def record_appearance(session: Session, game: Game, game_player: GamePlayer) -> None:
+    """Count a new lineup entry in the player's career, at the game's current score"""
+    if game_player.player_id in _with_careers(session, [game_player.player_id]):
+        is_home = game_player.team_id == game.home_team_id
+        goals_for, goals_against = (game.home_score, game.away_score) if is_home else (game.away_score, game.home_score)
+        _adjust_careers(session, [game_player.player_id], games=1, **{_outcome(goals_for, goals_against): 1})
+    bump_versions(session, Player, [game_player.player_id])
+
+def rebuild_player_stats(session: Session) -> int:
+    """Recompute every career row from goal/gameplayer, returns the number of players"""
+    session.exec(delete(PlayerCareerStats))
+    rows = session.exec(player_stats_statement()).all()
+    for player_id, games, wins, draws, losses, goals, assists in rows:
+        session.add(PlayerCareerStats(
+            player_id=player_id,
+            games=games,
+            wins=wins,
+            draws=draws,
+            losses=losses,
+            goals=goals,
+            assists=assists
+        ))
+    return len(rows)
+
+def player_games_statement(player_id: uuid.UUID):
+    """One row per appearance of the player, oldest game first.
+
+    Team and result come from CASE expressions over the game's stored
+    score counters, so no lineup or goal is loaded. Yields
+    (game_id, date, stadium, team, home_score, away_score, result, goals, assists).
+    """
+    is_home = GamePlayer.team_id == Game.home_team_id
+    goals_for = case((is_home, Game.home_score), else_=Game.away_score)
+    goals_against = case((is_home, Game.away_score), else_=Game.home_score)
+    return (
+        select(
+            Game.id.label("game_id"),
+            Game.date,
+            func.coalesce(Stadium.name, "").label("stadium"),
+            case((is_home, "home"), else_="away").label("team"),
+            Game.home_score,
+            Game.away_score,
+            case(
+                (goals_for > goals_against, "win"),
+                (goals_for < goals_against, "loss"),
+                else_="draw",
+            ).label("result"),
+            GamePlayer.goals,
+            GamePlayer.assists,
+        )
+        .join(Game, Game.id == GamePlayer.game_id)
+        .outerjoin(Stadium, Stadium.id == Game.stadium_id)
+        .where(GamePlayer.player_id == player_id)
+        .order_by(Game.date, Game.id)
+    )
+
+def player_stats_payload(player: Player, career: Optional[PlayerCareerStats]) -> dict:
+    """GlobalPlayerStats as a plain dict, from a player and its precomputed career row"""
+    games, goals = (career.games, career.goals) if career else (0, 0)
+    return {
+        "id": player.id,
+        "name": player.name,
+        "nickname": player.nickname,
+        "profile": player.profile,
+        "games_played": games,
+        "total_goals": goals,
+        "total_assists": career.assists if career else 0,
+        "wins": career.wins if career else 0,
+        "draws": career.draws if career else 0,
+        "losses": career.losses if career else 0,
+        "goals_per_game": round(goals / games, 2) if games > 0 else 0,
+    }
+
+def get_player_stats(player: Player, career: Optional[PlayerCareerStats]) -> GlobalPlayerStats:
+    """Build GlobalPlayerStats from a player and its precomputed career row"""
+    return GlobalPlayerStats.model_validate(player_stats_payload(player, career))
+
+# ==========================
+# GAME
+# ==========================
+
+def record_goal(session: Session, game: Game, goal: Goal) -> dict:
+    """Bump the denormalized score, lineup counters and career rows for a new goal.
+
+    Returns the new score, as {"home_team": ..., "away_team": ...}.
+    """
+    return _apply_goal(session, game, goal, 1)
+
+def remove_goal(session: Session, game: Game, goal: Goal) -> dict:
+    """Undo record_goal() for a goal that is about to be deleted"""
+    return _apply_goal(session, game, goal, -1)
+
+def _apply_goal(session: Session, game: Game, goal: Goal, delta: int) -> dict:
+    # Incremented in SQL so concurrent goals do not overwrite each other,
+    # RETURNING gives the score this goal moved the game to
+    is_home = goal.team_id == game.home_team_id
+    column = Game.home_score if is_home else Game.away_score
+    home, away = session.exec(
+        update(Game)
+        .where(Game.id == game.id)
+        .values({column: column + delta})
+        .returning(Game.home_score, Game.away_score)
+        .execution_options(synchronize_session=False)
+    ).one()
+    old_home, old_away = (home - delta, away) if is_home else (home, away - delta)
+    # Not a pending change: flushing it would overwrite concurrent goals
+    set_committed_value(game, "home_score", home)
+    set_committed_value(game, "away_score", away)
+    _bump_lineup_counters(session, goal, delta)
+
+    # Only the players this goal touches: its scorer and assister, and the
+    # lineups when it turns a win, draw or loss into another result
+    lineups: dict[uuid.UUID, list[uuid.UUID]] = {}
+    if _outcome(old_home, old_away) != _outcome(home, away):
+        for player_id, team_id in session.exec(
+            select(GamePlayer.player_id, GamePlayer.team_id).where(GamePlayer.game_id == game.id)
+        ):
+            lineups.setdefault(team_id, []).append(player_id)
+    home_ids = lineups.get(game.home_team_id, [])
+    away_ids = lineups.get(game.away_team_id, [])
+
+    with_careers = _with_careers(session, [goal.scorer_id, goal.assister_id, *home_ids, *away_ids])
+    _adjust_careers(session, {goal.scorer_id} & with_careers, goals=delta)
+    _adjust_careers(session, {goal.assister_id} & with_careers, assists=delta)
+    for player_ids, (old_for, old_against), (new_for, new_against) in [
+        (home_ids, (old_home, old_away), (home, away)),
+        (away_ids, (old_away, old_home), (away, home)),
+    ]:
+        _adjust_careers(session, set(player_ids) & with_careers,
+                        **{_outcome(old_for, old_against): -1, _outcome(new_for, new_against): 1})
+    bump_versions(session, Player, {goal.scorer_id, goal.assister_id, *home_ids, *away_ids} - {None})
+    return {"home_team": home, "away_team": away}
+
+def _bump_lineup_counters(session: Session, goal: Goal, delta: int) -> None:
+    session.exec(
+        update(GamePlayer)
+        .where(GamePlayer.game_id == goal.game_id, GamePlayer.player_id == goal.scorer_id)
+        .values(goals=GamePlayer.goals + delta)
+    )
+    if goal.assister_id:
+        session.exec(
+            update(GamePlayer)
+            .where(GamePlayer.game_id == goal.game_id, GamePlayer.player_id == goal.assister_id)
+            .values(assists=GamePlayer.assists + delta)
+        )
+
+def count_lineup_goals(session: Session, game_player: GamePlayer) -> None:
+    """Seed the counters of a player joining a game that already has goals"""
+    goals, assists = session.exec(
+        select(
+            func.count(case((Goal.scorer_id == game_player.player_id, 1))),
+            func.count(case((Goal.assister_id == game_player.player_id, 1))),
+        ).where(Goal.game_id == game_player.game_id)
+    ).one()
+    game_player.goals = goals
+    game_player.assists = assists
+
+def recount_games(session: Session, game_ids: Iterable[uuid.UUID]) -> None:
+    """Recompute scores and lineup counters of the given games from the goal table"""
+    game_ids = list(set(game_ids))
+    if not game_ids:
+        return
+
+    def goals_where(*criteria):
+        return select(func.count(Goal.id)).where(*criteria).scalar_subquery()
+
+    session.exec(
+        update(Game)
+        .where(Game.id.in_(game_ids))
+        .values(
+            home_score=goals_where(Goal.game_id == Game.id, Goal.team_id == Game.home_team_id),
+            away_score=goals_where(Goal.game_id == Game.id, Goal.team_id == Game.away_team_id),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    session.exec(
+        update(GamePlayer)
+        .where(GamePlayer.game_id.in_(game_ids))
+        .values(
+            goals=goals_where(Goal.game_id == GamePlayer.game_id, Goal.scorer_id == GamePlayer.player_id),
+            assists=goals_where(Goal.game_id == GamePlayer.game_id, Goal.assister_id == GamePlayer.player_id),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
@@ -0,0 +1,22 @@
+from typing import Iterable
+import uuid
+from sqlalchemy import update
+from sqlmodel import Session
+
+
+def bump_versions(session: Session, model, ids: Iterable[uuid.UUID]) -> None:
+    """Increment the version of the given rows, which changes their ETags.
+
+    Games are bumped for anything that changes their GameRead (lineups,
+    goals, status, player or stadium renames), players whenever their
+    career stats are refreshed.
+    """
+    ids = list(set(ids))
+    if not ids:
+        return
+
+    session.exec(
+        update(model)
+        .where(model.id.in_(ids))
+        .values(version=model.version + 1)
+    )
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+
+class TestGameExport:
+    """Test the NDJSON match archive export"""
+    
+    def test_export_empty(self, client: TestClient):
+        """Test exporting an empty archive"""
+        response = client.get("/api/export/games.ndjson")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert response.content == b""
+    
+    def test_export_games(self, client: TestClient, test_stadium, test_player):
+        """Test that every game is exported with lineups and goals, oldest first"""
+        start = datetime(2024, 1, 1, 20, 0)
+        games = []
+        for day in [2, 0, 1]:
+            game = client.post("/api/games", json={
+                "stadium_id": test_stadium["id"],
+                "date": (start + timedelta(days=day)).isoformat()
+            }).json()
+            games.append(game)
+        client.post(f"/api/games/{games[0]['id']}/players", json={
+            "player_id": test_player["id"],
+            "team_id": games[0]["home_team"]["id"]
+        })
+        
+        response = client.get("/api/export/games.ndjson")
+        
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == [games[1]["id"], games[2]["id"], games[0]["id"]]
+        assert lines[2]["home_team"]["players"][0]["id"] == test_player["id"]
+        assert lines[2]["stadium"]["id"] == test_stadium["id"]
+    
+    def test_export_in_batches(self, client: TestClient, test_stadium, monkeypatch):
+        """Test that small batches still export every game exactly once"""
+        from app.api.routes import export
+        monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+        for day in range(5):
+            client.post("/api/games", json={
+                "stadium_id": test_stadium["id"],
+                "date": (datetime(2024, 1, 1) + timedelta(days=day)).isoformat()
+            })
+        
+        response = client.get("/api/export/games.ndjson")
+        
+        assert len({json.loads(line)["id"] for line in response.text.splitlines()}) == 5
@@ -3,6 +3,8 @@ from fastapi.testclient import TestClient
 from datetime import datetime, timedelta
 import uuid
 
+from app.models.model import Game
+
 
 class TestGameCRUD:
     """Test Create, Read, Update, Delete operations for games"""
@@ -61,6 +63,25 @@ class TestGameCRUD:
         assert isinstance(games, list)
         assert len(games) <= 5
     
+    def test_list_games_with_cursor(self, client: TestClient, test_stadium):
+        """Test that cursor pages are stable while new games are created"""
+        start = datetime(2025, 1, 1)
+        for day in range(5):
+            client.post("/api/games", json={
+                "stadium_id": test_stadium["id"],
+                "date": (start + timedelta(days=day)).isoformat()
+            })
+        
+        first = client.get("/api/games", params={"limit": 3})
+        client.post("/api/games", json={
+            "stadium_id": test_stadium["id"],
+            "date": (start + timedelta(days=10)).isoformat()
+        })
+        second = client.get("/api/games", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+        
+        dates = [g["date"] for g in first.json() + second.json()]
+        assert dates == [(start + timedelta(days=day)).isoformat() for day in range(4, -1, -1)]
+    
     def test_get_game(self, client: TestClient, test_game):
         """Test getting a specific game"""
         response = client.get(f"/api/games/{test_game['id']}")
@@ -167,6 +188,42 @@ class TestGameLifecycle:
         response = client.put(f"/api/games/{fake_id}/end")
         
         assert response.status_code == 404
+    
+    def test_start_is_one_conditional_update(self, client: TestClient, test_game, query_log):
+        """Test that the started check and the write are the same statement"""
+        client.put(f"/api/games/{test_game['id']}/start")
+        
+        writes = [q for q in query_log if q.lstrip().upper().startswith("UPDATE GAME")]
+        assert len(writes) == 1
+        assert "started_at IS NULL" in writes[0]
+        assert not any(q.lstrip().upper().startswith("SELECT GAME.STARTED_AT") for q in query_log)
+    
+    def test_start_game_lost_race(self, client: TestClient, test_game, session):
+        """Test that a start whose conditional update matches nothing is refused"""
+        game = session.get(Game, uuid.UUID(test_game["id"]))
+        game.started_at = datetime.now()
+        session.add(game)
+        session.commit()
+        
+        response = client.put(f"/api/games/{test_game['id']}/start")
+        
+        assert response.status_code == 400
+        assert client.get(f"/api/games/{test_game['id']}").json()["started_at"] == game.started_at.isoformat()
+    
+    def test_create_game_round_trips(self, client: TestClient, test_stadium, query_log):
+        """Test that creating a game reads the stadium, writes once and reads nothing back"""
+        response = client.post("/api/games", json={"stadium_id": test_stadium["id"], "date": "2030-01-01T20:00:00"})
+        
+        assert response.status_code == 200
+        assert response.json()["stadium"]["id"] == test_stadium["id"]
+        assert response.json()["home_team"]["players"] == []
+        assert [q.split()[0] for q in query_log] == ["SELECT", "INSERT", "INSERT"]
+    
+    def test_create_game_unknown_stadium(self, client: TestClient):
+        """Test that a game cannot be created in a missing stadium"""
+        response = client.post("/api/games", json={"stadium_id": str(uuid.uuid4()), "date": "2030-01-01T20:00:00"})
+        
+        assert response.status_code == 404
 
 
 class TestGamePlayers:
@@ -207,6 +264,84 @@ class TestGamePlayers:
         response = client.post(f"/api/games/{test_game['id']}/players", json=data)
         
         assert response.status_code == 404
+    
+    def test_add_player_to_game_twice(self, client: TestClient, test_game, test_player):
+        """Test that the single route applies the batch route's lineup checks"""
+        url = f"/api/games/{test_game['id']}/players"
+        home = {"player_id": test_player["id"], "team_id": test_game["home_team"]["id"]}
+        away = {"player_id": test_player["id"], "team_id": test_game["away_team"]["id"]}
+        other = {"player_id": test_player["id"], "team_id": client.post("/api/games", json={
+            "stadium_id": test_game["stadium"]["id"], "date": "2030-01-01T20:00:00"
+        }).json()["home_team"]["id"]}
+        
+        assert client.post(url, json=other).status_code == 400
+        assert client.post(url, json=home).status_code == 200
+        assert client.post(url, json=home).json()["detail"] == "Player already in this game"
+        assert client.post(url, json=away).status_code == 400
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        assert [p["id"] for p in game["home_team"]["players"]] == [test_player["id"]]
+        assert game["away_team"]["players"] == []
+    
+    def test_add_players_batch(self, client: TestClient, test_game, multiple_players, query_log):
+        """Test building both lineups in one request"""
+        home, away = test_game["home_team"]["id"], test_game["away_team"]["id"]
+        lineup = [
+            {"player_id": multiple_players[0]["id"], "team_id": home},
+            {"player_id": multiple_players[1]["id"], "team_id": home},
+            {"player_id": multiple_players[2]["id"], "team_id": away},
+        ]
+        
+        query_log.clear()
+        response = client.post(f"/api/games/{test_game['id']}/players:batch", json=lineup)
+        
+        assert response.status_code == 200
+        game = response.json()
+        assert len(game["home_team"]["players"]) == 2
+        assert len(game["away_team"]["players"]) == 1
+        assert sum(query.lstrip().upper().startswith("INSERT INTO GAMEPLAYER") for query in query_log) == 1
+    
+    def test_add_players_batch_is_all_or_nothing(self, client: TestClient, test_game, test_player):
+        """Test that one unknown player rejects the whole lineup"""
+        lineup = [
+            {"player_id": test_player["id"], "team_id": test_game["home_team"]["id"]},
+            {"player_id": str(uuid.uuid4()), "team_id": test_game["home_team"]["id"]},
+        ]
+        response = client.post(f"/api/games/{test_game['id']}/players:batch", json=lineup)
+        
+        assert response.status_code == 404
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        assert game["home_team"]["players"] == []
+    
+    def test_add_players_batch_rejects_other_teams(self, client: TestClient, test_game, test_player):
+        """Test that players can only join the game's own teams"""
+        lineup = [{"player_id": test_player["id"], "team_id": str(uuid.uuid4())}]
+        response = client.post(f"/api/games/{test_game['id']}/players:batch", json=lineup)
+        
+        assert response.status_code == 400
+    
+    def test_add_players_batch_rejects_duplicates(self, client: TestClient, test_game, test_player):
+        """Test that a player cannot be listed twice or join a game twice"""
+        entry = {"player_id": test_player["id"], "team_id": test_game["home_team"]["id"]}
+        
+        response = client.post(f"/api/games/{test_game['id']}/players:batch", json=[entry, entry])
+        assert response.status_code == 400
+        
+        client.post(f"/api/games/{test_game['id']}/players:batch", json=[entry])
+        response = client.post(f"/api/games/{test_game['id']}/players:batch", json=[entry])
+        assert response.status_code == 400
+    
+    def test_add_players_batch_counts_earlier_goals(self, client: TestClient, test_game, test_player):
+        """Test that late arrivals get credit for goals already recorded"""
+        client.post(f"/api/games/{test_game['id']}/goals", json={
+            "team_id": test_game["home_team"]["id"],
+            "scorer_id": test_player["id"]
+        })
+        lineup = [{"player_id": test_player["id"], "team_id": test_game["home_team"]["id"]}]
+        
+        game = client.post(f"/api/games/{test_game['id']}/players:batch", json=lineup).json()
+        
+        assert game["home_team"]["players"][0]["goals"] == 1
+        assert client.get(f"/api/players/{test_player['id']}").json()["games_played"] == 1
 
 
 class TestGameGoals:
@@ -282,4 +417,390 @@ class TestGameGoals:
         }
         response = client.post(f"/api/games/{test_game['id']}/goals", json=goal_data)
         
-        assert response.status_code == 404
\ No newline at end of file
+        assert response.status_code == 404
+    
+    def test_add_goals_batch(self, client: TestClient, test_game, multiple_players, query_log):
+        """Test entering a whole game's goals in one request"""
+        a, b, c = multiple_players
+        home, away = test_game["home_team"]["id"], test_game["away_team"]["id"]
+        client.post(f"/api/games/{test_game['id']}/players:batch", json=[
+            {"player_id": a["id"], "team_id": home},
+            {"player_id": b["id"], "team_id": home},
+            {"player_id": c["id"], "team_id": away},
+        ])
+        goals = [
+            {"team_id": home, "scorer_id": a["id"], "assister_id": b["id"]},
+            {"team_id": home, "scorer_id": a["id"]},
+            {"team_id": away, "scorer_id": c["id"]},
+        ]
+        
+        query_log.clear()
+        response = client.post(f"/api/games/{test_game['id']}/goals:batch", json=goals)
+        
+        assert response.status_code == 200
+        game = response.json()
+        assert game["score"] == {"home_team": 2, "away_team": 1}
+        assert len(game["goals"]) == 3
+        assert {p["name"]: p["goals"] for p in game["home_team"]["players"]} == {a["name"]: 2, b["name"]: 0}
+        assert sum(query.lstrip().upper().startswith("INSERT INTO GOAL") for query in query_log) == 1
+        
+        career = client.get(f"/api/players/{a['id']}").json()
+        assert (career["total_goals"], career["wins"]) == (2, 1)
+    
+    def test_add_goals_batch_is_all_or_nothing(self, client: TestClient, test_game, test_player):
+        """Test that one unknown assister rejects every goal"""
+        goals = [
+            {"team_id": test_game["home_team"]["id"], "scorer_id": test_player["id"]},
+            {"team_id": test_game["home_team"]["id"], "scorer_id": test_player["id"],
+             "assister_id": str(uuid.uuid4())},
+        ]
+        response = client.post(f"/api/games/{test_game['id']}/goals:batch", json=goals)
+        
+        assert response.status_code == 404
+        assert client.get(f"/api/games/{test_game['id']}").json()["goals"] == []
+    
+    def test_add_goals_batch_rejects_other_teams(self, client: TestClient, test_game, test_player):
+        """Test that goals can only go to the game's own teams"""
+        goals = [{"team_id": str(uuid.uuid4()), "scorer_id": test_player["id"]}]
+        response = client.post(f"/api/games/{test_game['id']}/goals:batch", json=goals)
+        
+        assert response.status_code == 400
+
+class TestGameQueries:
+    """Test that game reads cost a fixed number of queries"""
+    
+    def _play_game(self, client: TestClient, stadium, players):
+        game = client.post("/api/games", json={
+            "stadium_id": stadium["id"],
+            "date": datetime.now().isoformat()
+        }).json()
+        for i, player in enumerate(players):
+            team = game["home_team"] if i % 2 == 0 else game["away_team"]
+            client.post(f"/api/games/{game['id']}/players", json={
+                "player_id": player["id"],
+                "team_id": team["id"]
+            })
+            client.post(f"/api/games/{game['id']}/goals", json={
+                "team_id": team["id"],
+                "scorer_id": player["id"],
+                "assister_id": players[i - 2]["id"] if i >= 2 else None
+            })
+        return game
+    
+    def test_get_game_query_count(self, client: TestClient, test_stadium, multiple_players, query_log):
+        """Test that a full game graph is fetched in a handful of queries"""
+        game = self._play_game(client, test_stadium, multiple_players)
+        
+        query_log.clear()
+        response = client.get(f"/api/games/{game['id']}")
+        
+        assert response.status_code == 200
+        content = response.json()
+        assert len(content["goals"]) == len(multiple_players)
+        assert content["score"] == {"home_team": 2, "away_team": 1}
+        assert len(query_log) <= 4
+    
+    def test_list_games_query_count_is_constant(self, client: TestClient, test_stadium, multiple_players, query_log):
+        """Test that listing games does not issue queries per game"""
+        self._play_game(client, test_stadium, multiple_players)
+        query_log.clear()
+        client.get("/api/games")
+        single_game_queries = len(query_log)
+        
+        for _ in range(3):
+            self._play_game(client, test_stadium, multiple_players)
+        query_log.clear()
+        response = client.get("/api/games")
+        
+        assert response.status_code == 200
+        assert len(response.json()) == 4
+        assert len(query_log) == single_game_queries
+
+
+class TestGameScore:
+    """Test the stored score and lineup counters"""
+    
+    def _add_goal(self, client: TestClient, game, team, scorer, assister=None):
+        response = client.post(f"/api/games/{game['id']}/goals", json={
+            "team_id": game[team]["id"],
+            "scorer_id": scorer["id"],
+            "assister_id": assister["id"] if assister else None
+        })
+        assert response.status_code == 200
+    
+    def _lineup(self, game_data, team):
+        return {p["id"]: p for p in game_data[team]["players"]}
+    
+    def test_score_and_counters(self, client: TestClient, test_game, multiple_players):
+        """Test that goals update the scoreboard and the lineup counters"""
+        a, b, c = multiple_players
+        for player, team in [(a, "home_team"), (b, "home_team"), (c, "away_team")]:
+            client.post(f"/api/games/{test_game['id']}/players", json={
+                "player_id": player["id"],
+                "team_id": test_game[team]["id"]
+            })
+        self._add_goal(client, test_game, "home_team", a, b)
+        self._add_goal(client, test_game, "home_team", a)
+        self._add_goal(client, test_game, "away_team", c)
+        
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        home = self._lineup(game, "home_team")
+        
+        assert game["score"] == {"home_team": 2, "away_team": 1}
+        assert home[a["id"]]["goals"] == 2
+        assert home[b["id"]]["assists"] == 1
+        assert self._lineup(game, "away_team")[c["id"]]["goals"] == 1
+    
+    def test_late_player_counters(self, client: TestClient, test_game, test_player):
+        """Test that a player added after scoring gets their goals counted"""
+        self._add_goal(client, test_game, "home_team", test_player)
+        client.post(f"/api/games/{test_game['id']}/players", json={
+            "player_id": test_player["id"],
+            "team_id": test_game["home_team"]["id"]
+        })
+        
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        
+        assert self._lineup(game, "home_team")[test_player["id"]]["goals"] == 1
+    
+    def test_delete_goal(self, client: TestClient, test_game, multiple_players):
+        """Test that deleting a goal rolls back the score and counters"""
+        a, b, _ = multiple_players
+        for player in [a, b]:
+            client.post(f"/api/games/{test_game['id']}/players", json={
+                "player_id": player["id"],
+                "team_id": test_game["home_team"]["id"]
+            })
+        self._add_goal(client, test_game, "home_team", a, b)
+        goal = client.get(f"/api/games/{test_game['id']}").json()["goals"][0]
+        
+        response = client.delete(f"/api/games/{test_game['id']}/goals/{goal['id']}")
+        
+        assert response.status_code == 200
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        home = self._lineup(game, "home_team")
+        assert game["goals"] == []
+        assert game["score"] == {"home_team": 0, "away_team": 0}
+        assert home[a["id"]]["goals"] == 0
+        assert home[b["id"]]["assists"] == 0
+        assert client.get(f"/api/players/{a['id']}").json()["total_goals"] == 0
+    
+    def test_delete_goal_not_found(self, client: TestClient, test_game):
+        """Test deleting a goal that does not exist"""
+        fake_id = str(uuid.uuid4())
+        response = client.delete(f"/api/games/{test_game['id']}/goals/{fake_id}")
+        
+        assert response.status_code == 404
+    
+    def test_delete_scorer_updates_score(self, client: TestClient, test_game, multiple_players):
+        """Test that deleting a player removes their goals from the score"""
+        a, b, _ = multiple_players
+        for player in [a, b]:
+            client.post(f"/api/games/{test_game['id']}/players", json={
+                "player_id": player["id"],
+                "team_id": test_game["home_team"]["id"]
+            })
+        self._add_goal(client, test_game, "home_team", a, b)
+        self._add_goal(client, test_game, "home_team", b)
+        
+        client.delete(f"/api/players/{a['id']}")
+        
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        assert game["score"] == {"home_team": 1, "away_team": 0}
+        assert self._lineup(game, "home_team")[b["id"]]["assists"] == 0
+
+
+class TestEndedGameCache:
+    """Test caching of ended games"""
+    
+    def _end(self, client: TestClient, game):
+        client.put(f"/api/games/{game['id']}/start")
+        client.put(f"/api/games/{game['id']}/end")
+    
+    def test_ended_game_is_cached(self, client: TestClient, test_game, query_log):
+        """Test that an ended game is served without touching the database"""
+        self._end(client, test_game)
+        first = client.get(f"/api/games/{test_game['id']}")
+        
+        query_log.clear()
+        second = client.get(f"/api/games/{test_game['id']}")
+        
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert query_log == []
+    
+    def test_running_game_is_not_cached(self, client: TestClient, test_game, query_log):
+        """Test that games still in play are always read from the database"""
+        client.put(f"/api/games/{test_game['id']}/start")
+        client.get(f"/api/games/{test_game['id']}")
+        
+        query_log.clear()
+        client.get(f"/api/games/{test_game['id']}")
+        
+        assert query_log != []
+    
+    def test_goal_invalidates_cache(self, client: TestClient, test_game, test_player):
+        """Test that a goal added after the final whistle shows up"""
+        self._end(client, test_game)
+        client.get(f"/api/games/{test_game['id']}")
+        
+        client.post(f"/api/games/{test_game['id']}/goals", json={
+            "team_id": test_game["away_team"]["id"],
+            "scorer_id": test_player["id"]
+        })
+        
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        assert game["score"] == {"home_team": 0, "away_team": 1}
+    
+    def test_player_rename_invalidates_cache(self, client: TestClient, test_game, test_player):
+        """Test that renaming a player refreshes the lineups they appear in"""
+        client.post(f"/api/games/{test_game['id']}/players", json={
+            "player_id": test_player["id"],
+            "team_id": test_game["home_team"]["id"]
+        })
+        self._end(client, test_game)
+        client.get(f"/api/games/{test_game['id']}")
+        
+        client.put(f"/api/players/{test_player['id']}", json={"name": "Renamed"})
+        
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        assert game["home_team"]["players"][0]["name"] == "Renamed"
+    
+    def test_stadium_rename_invalidates_cache(self, client: TestClient, test_game):
+        """Test that renaming a stadium refreshes its games"""
+        self._end(client, test_game)
+        client.get(f"/api/games/{test_game['id']}")
+        
+        client.put(f"/api/stadiums/{test_game['stadium']['id']}", params={"name": "New Ground"})
+        
+        game = client.get(f"/api/games/{test_game['id']}").json()
+        assert game["stadium"]["name"] == "New Ground"
+    
+    def test_deleted_game_is_not_served(self, client: TestClient, test_game):
+        """Test that deleting an ended game evicts it"""
+        self._end(client, test_game)
+        client.get(f"/api/games/{test_game['id']}")
+        
+        client.delete(f"/api/games/{test_game['id']}")
+        
+        assert client.get(f"/api/games/{test_game['id']}").status_code == 404
+
+
+class TestGameETags:
+    """Test conditional GETs on games"""
+    
+    def test_get_game_not_modified(self, client: TestClient, test_game):
+        """Test that a matching If-None-Match gets an empty 304"""
+        etag = client.get(f"/api/games/{test_game['id']}").headers["ETag"]
+        
+        response = client.get(f"/api/games/{test_game['id']}", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+    
+    def test_goal_changes_etag(self, client: TestClient, test_game, test_player):
+        """Test that recording a goal produces a new ETag"""
+        etag = client.get(f"/api/games/{test_game['id']}").headers["ETag"]
+        
+        client.post(f"/api/games/{test_game['id']}/goals", json={
+            "team_id": test_game["home_team"]["id"],
+            "scorer_id": test_player["id"]
+        })
+        
+        response = client.get(f"/api/games/{test_game['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    
+    def test_cached_game_not_modified(self, client: TestClient, test_game, query_log):
+        """Test that an ended game revalidates without touching the database"""
+        client.put(f"/api/games/{test_game['id']}/start")
+        client.put(f"/api/games/{test_game['id']}/end")
+        etag = client.get(f"/api/games/{test_game['id']}").headers["ETag"]
+        
+        query_log.clear()
+        response = client.get(f"/api/games/{test_game['id']}", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert query_log == []
+    
+    def test_list_games_not_modified(self, client: TestClient, test_game):
+        """Test that an unchanged page of games gets a 304"""
+        etag = client.get("/api/games").headers["ETag"]
+        
+        assert client.get("/api/games", headers={"If-None-Match": etag}).status_code == 304
+        
+        client.put(f"/api/games/{test_game['id']}/start")
+        assert client.get("/api/games", headers={"If-None-Match": etag}).status_code == 200
+
+
+class TestGameEvents:
+    """Test live game events"""
+    
+    @pytest.fixture
+    def published(self, monkeypatch):
+        from app.core.events import game_events
+        events = []
+        monkeypatch.setattr(game_events, "deliver", lambda channel, event: events.append((channel, event)))
+        return events
+    
+    def test_writes_publish_deltas(self, client: TestClient, test_game, test_player, published):
+        """Test that lineup, goal and status changes are pushed to the game's channel"""
+        game_id = test_game["id"]
+        client.put(f"/api/games/{game_id}/start")
+        client.post(f"/api/games/{game_id}/players", json={
+            "player_id": test_player["id"],
+            "team_id": test_game["home_team"]["id"]
+        })
+        client.post(f"/api/games/{game_id}/goals", json={
+            "team_id": test_game["home_team"]["id"],
+            "scorer_id": test_player["id"]
+        })
+        client.put(f"/api/games/{game_id}/end")
+        
+        assert {channel for channel, _ in published} == {game_id}
+        events = [event for _, event in published]
+        assert [event["type"] for event in events] == ["status", "lineup", "goals", "status"]
+        assert events[1]["data"]["players"][0]["player"]["name"] == test_player["name"]
+        assert events[2]["data"]["goals"][0]["scorer"]["id"] == test_player["id"]
+        assert events[2]["data"]["score"] == {"home_team": 1, "away_team": 0}
+        assert events[3]["data"]["status"] == "ended"
+    
+    def test_goal_events_from_the_write(self, client: TestClient, test_game, multiple_players, published, query_log):
+        """Test that goal events carry the assister and score without re-reading them"""
+        game_id = test_game["id"]
+        scorer, assister, _ = multiple_players
+        query_log.clear()
+        goal = client.post(f"/api/games/{game_id}/goals", json={
+            "team_id": test_game["away_team"]["id"],
+            "scorer_id": scorer["id"],
+            "assister_id": assister["id"]
+        })
+        
+        assert goal.status_code == 200
+        player_reads = [q for q in query_log if q.startswith("SELECT player.id, player.name")]
+        assert len(player_reads) == 1
+        added = published[-1][1]["data"]
+        assert added["goals"][0]["assister"]["id"] == assister["id"]
+        assert added["score"] == {"home_team": 0, "away_team": 1}
+        
+        goal_id = added["goals"][0]["id"]
+        client.delete(f"/api/games/{game_id}/goals/{goal_id}")
+        
+        deleted = published[-1][1]
+        assert deleted == {"type": "goal_deleted", "data": {"goal_id": goal_id, "score": {"home_team": 0, "away_team": 0}}}
+    
+    def test_events_not_found(self, client: TestClient):
+        """Test subscribing to a non-existent game"""
+        response = client.get(f"/api/games/{uuid.uuid4()}/events")
+        
+        assert response.status_code == 404
+    
+    def test_events_of_ended_game(self, client: TestClient, test_game):
+        """Test that ended games have no live stream"""
+        client.put(f"/api/games/{test_game['id']}/start")
+        client.put(f"/api/games/{test_game['id']}/end")
+        
+        response = client.get(f"/api/games/{test_game['id']}/events")
+        
+        assert response.status_code == 400
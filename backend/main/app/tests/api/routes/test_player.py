@@ -2,6 +2,9 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 import uuid
+from datetime import datetime
+
+from app.models.stats import leaderboard_statement, rebuild_player_stats
 
 
 @pytest.fixture
@@ -164,6 +167,37 @@ class TestPlayerCRUD:
         assert content[0]["name"] == "TestName"
         assert content[0]["nickname"] == "TestNickname"
         
+    def test_search_players_ranks_prefix_matches_first(self, client: TestClient):
+        """Test that names starting with the query come before other matches"""
+        for name in ["Rossi", "De Rossi"]:
+            client.post("/api/players", json={"name": name})
+        
+        response = client.get("/api/players/search/by-name", params={"name": "ross"})
+        
+        assert [p["name"] for p in response.json()] == ["Rossi", "De Rossi"]
+    
+    def test_search_players_by_nickname(self, client: TestClient):
+        """Test that the search also looks at nicknames"""
+        client.post("/api/players", json={"name": "Francesco", "nickname": "Il Capitano"})
+        
+        response = client.get("/api/players/search/by-name", params={"name": "capitano"})
+        
+        assert [p["name"] for p in response.json()] == ["Francesco"]
+    
+    def test_search_players_with_cursor(self, client: TestClient):
+        """Test paging through search results with the cursor header"""
+        for i in range(5):
+            client.post("/api/players", json={"name": f"Bianchi {i}"})
+        
+        first = client.get("/api/players/search/by-name", params={"name": "bianchi", "limit": 3})
+        second = client.get("/api/players/search/by-name", params={
+            "name": "bianchi", "limit": 3, "cursor": first.headers["X-Next-Cursor"]
+        })
+        
+        names = [p["name"] for p in first.json() + second.json()]
+        assert sorted(names) == [f"Bianchi {i}" for i in range(5)]
+        assert "X-Next-Cursor" not in second.headers
+        
     
     def test_get_player_games_empty(self, client: TestClient, test_player):
         """Test getting games for a player with no games"""
@@ -179,4 +213,275 @@ class TestPlayerCRUD:
         fake_id = str(uuid.uuid4())
         response = client.get(f"/api/players/{fake_id}/games")
         
-        assert response.status_code == 404
\ No newline at end of file
+        assert response.status_code == 404
+
+class TestPlayerStats:
+    """Test aggregated player statistics"""
+    
+    def _play_game(self, client: TestClient, stadium, home, away, goals):
+        game = client.post("/api/games", json={
+            "stadium_id": stadium["id"],
+            "date": datetime.now().isoformat()
+        }).json()
+        for team, players in [(game["home_team"], home), (game["away_team"], away)]:
+            for player in players:
+                client.post(f"/api/games/{game['id']}/players", json={
+                    "player_id": player["id"],
+                    "team_id": team["id"]
+                })
+        for scorer, assister in goals:
+            team = game["home_team"] if scorer in home else game["away_team"]
+            client.post(f"/api/games/{game['id']}/goals", json={
+                "team_id": team["id"],
+                "scorer_id": scorer["id"],
+                "assister_id": assister["id"] if assister else None
+            })
+        return game
+    
+    def test_player_stats(self, client: TestClient, test_stadium, multiple_players):
+        """Test games, goals, assists and wins for a player"""
+        a, b, c = multiple_players
+        self._play_game(client, test_stadium, [a, b], [c], [(a, b), (a, None), (c, None)])
+        self._play_game(client, test_stadium, [a], [b, c], [(b, c)])
+        self._play_game(client, test_stadium, [c], [a], [])
+        
+        stats = {p["id"]: p for p in client.get("/api/players").json()}
+        
+        assert stats[a["id"]]["games_played"] == 3
+        assert stats[a["id"]]["total_goals"] == 2
+        assert stats[a["id"]]["total_assists"] == 0
+        assert stats[a["id"]]["wins"] == 1
+        assert stats[a["id"]]["goals_per_game"] == 0.67
+        assert stats[b["id"]]["wins"] == 2
+        assert stats[b["id"]]["total_assists"] == 1
+        assert stats[c["id"]]["wins"] == 1
+        assert stats[c["id"]]["total_assists"] == 1
+        assert client.get(f"/api/players/{a['id']}").json() == stats[a["id"]]
+    
+    def test_player_games(self, client: TestClient, test_stadium, multiple_players):
+        """Test team, score and result of each appearance"""
+        a, b, c = multiple_players
+        first = self._play_game(client, test_stadium, [a, b], [c], [(a, b), (a, None), (c, None)])
+        second = self._play_game(client, test_stadium, [c], [a], [(c, None)])
+        
+        games = {g["game_id"]: g for g in client.get(f"/api/players/{a['id']}/games").json()}
+        
+        assert games[first["id"]] == {
+            "game_id": first["id"],
+            "date": first["date"],
+            "stadium": test_stadium["name"],
+            "team": "home",
+            "score": "2 - 1",
+            "result": "win",
+            "goals": 2,
+            "assists": 0,
+        }
+        assert games[second["id"]]["team"] == "away"
+        assert games[second["id"]]["score"] == "1 - 0"
+        assert games[second["id"]]["result"] == "loss"
+    
+    def test_player_games_query_count_is_constant(self, client: TestClient, test_stadium, multiple_players, query_log):
+        """Test that a player's history is read without loading any game graph"""
+        a, b, c = multiple_players
+        self._play_game(client, test_stadium, [a], [b], [(a, None)])
+        query_log.clear()
+        client.get(f"/api/players/{a['id']}/games")
+        one_game_queries = len(query_log)
+        
+        for _ in range(3):
+            self._play_game(client, test_stadium, [a, c], [b], [(a, c), (b, None)])
+        query_log.clear()
+        response = client.get(f"/api/players/{a['id']}/games")
+        
+        assert len(response.json()) == 4
+        assert len(query_log) == one_game_queries == 2
+    
+    def test_list_players_query_count_is_constant(self, client: TestClient, test_stadium, multiple_players, query_log):
+        """Test that listing players does not issue queries per player or game"""
+        a, b, c = multiple_players
+        self._play_game(client, test_stadium, [a], [b], [(a, None)])
+        query_log.clear()
+        client.get("/api/players")
+        few_games_queries = len(query_log)
+        
+        for _ in range(3):
+            self._play_game(client, test_stadium, [a, c], [b], [(a, c), (b, None)])
+        query_log.clear()
+        response = client.get("/api/players")
+        
+        assert response.status_code == 200
+        assert len(query_log) == few_games_queries == 1
+    
+    def test_player_stats_after_game_deleted(self, client: TestClient, test_stadium, multiple_players):
+        """Test that deleting a game removes it from career totals"""
+        a, b, c = multiple_players
+        self._play_game(client, test_stadium, [a], [b], [(a, None)])
+        game = self._play_game(client, test_stadium, [a], [b, c], [(b, c), (c, None)])
+        
+        client.delete(f"/api/games/{game['id']}")
+        
+        stats = {p["id"]: p for p in client.get("/api/players").json()}
+        assert stats[a["id"]]["games_played"] == 1
+        assert stats[a["id"]]["losses"] == 0
+        assert stats[b["id"]]["total_goals"] == 0
+        assert stats[b["id"]]["losses"] == 1
+        assert stats[c["id"]]["games_played"] == 0
+        assert stats[c["id"]]["total_assists"] == 0
+    
+    def test_rebuild_player_stats(self, client: TestClient, session: Session, test_stadium, multiple_players):
+        """Test that a rebuild yields the same totals as incremental upkeep"""
+        a, b, c = multiple_players
+        self._play_game(client, test_stadium, [a, b], [c], [(a, b), (c, None)])
+        self._play_game(client, test_stadium, [c], [a], [(c, None)])
+        client.delete(f"/api/players/{b['id']}")
+        incremental = client.get("/api/players").json()
+        
+        rebuild_player_stats(session)
+        session.commit()
+        
+        assert client.get("/api/players").json() == incremental
+    
+    def test_incremental_stats_match_rebuild(self, client: TestClient, session: Session, test_stadium, multiple_players):
+        """Test that goal deltas, result flips and late lineup entries add up to a rebuild"""
+        a, b, c = multiple_players
+        game = self._play_game(client, test_stadium, [a], [b], [(a, None), (b, a), (a, None)])
+        client.post(f"/api/games/{game['id']}/players", json={"player_id": c["id"], "team_id": game["away_team"]["id"]})
+        goals = client.get(f"/api/games/{game['id']}").json()["goals"]
+        client.delete(f"/api/games/{game['id']}/goals/{goals[0]['id']}")
+        client.put(f"/api/games/{game['id']}/start")
+        client.put(f"/api/games/{game['id']}/end")
+        incremental = client.get("/api/players").json()
+        
+        rebuild_player_stats(session)
+        session.commit()
+        
+        assert client.get("/api/players").json() == incremental
+        stats = {p["id"]: p for p in incremental}
+        assert (stats[a["id"]]["draws"], stats[b["id"]]["draws"], stats[c["id"]]["draws"]) == (1, 1, 1)
+    
+    def test_duplicate_lineup_entry_keeps_careers_exact(self, client: TestClient, session: Session, test_stadium, multiple_players):
+        """Test that a repeated lineup add is rejected, so a result flip still matches a rebuild"""
+        a, b, c = multiple_players
+        game = self._play_game(client, test_stadium, [a, c], [b], [(a, None), (b, None), (a, None), (b, None)])
+        
+        response = client.post(f"/api/games/{game['id']}/players", json={"player_id": a["id"], "team_id": game["home_team"]["id"]})
+        client.post(f"/api/games/{game['id']}/goals", json={"team_id": game["home_team"]["id"], "scorer_id": c["id"]})
+        incremental = client.get("/api/players").json()
+        
+        rebuild_player_stats(session)
+        session.commit()
+        
+        assert response.status_code == 400
+        assert client.get("/api/players").json() == incremental
+        stats = {p["id"]: p for p in incremental}
+        assert (stats[a["id"]]["games_played"], stats[a["id"]]["wins"], stats[a["id"]]["draws"]) == (1, 1, 0)
+    
+    def test_goal_updates_careers_incrementally(self, client: TestClient, test_stadium, multiple_players, query_log):
+        """Test that a goal applies deltas instead of re-aggregating careers"""
+        a, b, c = multiple_players
+        for _ in range(3):
+            self._play_game(client, test_stadium, [a], [b], [(a, None)])
+        game = self._play_game(client, test_stadium, [a], [b], [])
+        query_log.clear()
+        
+        client.post(f"/api/games/{game['id']}/goals", json={"team_id": game["home_team"]["id"], "scorer_id": a["id"]})
+        
+        assert not any("GROUP BY" in q for q in query_log)
+        stats = {p["id"]: p for p in client.get("/api/players").json()}
+        assert (stats[a["id"]]["wins"], stats[a["id"]]["draws"], stats[a["id"]]["total_goals"]) == (4, 0, 4)
+        assert stats[b["id"]]["losses"] == 4
+    
+    def test_list_players_with_cursor(self, client: TestClient, multiple_players):
+        """Test walking the player list with a cursor"""
+        first = client.get("/api/players", params={"limit": 2})
+        second = client.get("/api/players", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+        
+        names = [p["name"] for p in first.json() + second.json()]
+        assert names == ["Player0", "Player1", "Player2"]
+        assert "X-Next-Cursor" not in second.headers
+
+    
+    def test_leaderboard(self, client: TestClient, test_stadium, multiple_players):
+        """Test ranking players by goals, ties sharing a rank"""
+        a, b, c = multiple_players
+        self._play_game(client, test_stadium, [a, b], [c], [(a, b), (a, None), (c, None), (b, None)])
+        
+        response = client.get("/api/players/leaderboard", params={"metric": "goals"})
+        
+        assert response.status_code == 200
+        board = [(p["name"], p["total_goals"], p["rank"]) for p in response.json()]
+        assert board[0] == (a["name"], 2, 1)
+        assert sorted(board[1:]) == [(b["name"], 1, 2), (c["name"], 1, 2)]
+    
+    def test_leaderboard_goals_per_game_threshold(self, client: TestClient, test_stadium, multiple_players):
+        """Test that min_games keeps one-off appearances off the board"""
+        a, b, c = multiple_players
+        self._play_game(client, test_stadium, [a], [b], [(a, None), (b, None)])
+        self._play_game(client, test_stadium, [a], [c], [(c, None), (c, None)])
+        
+        response = client.get("/api/players/leaderboard", params={"metric": "goals_per_game", "min_games": 2})
+        
+        assert [p["name"] for p in response.json()] == [a["name"]]
+        
+        response = client.get("/api/players/leaderboard", params={"metric": "goals_per_game", "limit": 1})
+        assert [(p["name"], p["goals_per_game"]) for p in response.json()] == [(c["name"], 2.0)]
+    
+    def test_leaderboard_without_threshold_lists_newcomers_last(self, client: TestClient, test_stadium, multiple_players):
+        """Test that min_games=0 ranks players with no career row after everyone else"""
+        a, b, c = multiple_players
+        self._play_game(client, test_stadium, [a], [b], [(a, None)])
+        
+        response = client.get("/api/players/leaderboard", params={"metric": "goals", "min_games": 0})
+        
+        board = [(p["name"], p["rank"]) for p in response.json()]
+        assert board == [(a["name"], 1), (b["name"], 2), (c["name"], 3)]
+    
+    @pytest.mark.parametrize("metric", ["goals", "assists", "wins"])
+    def test_leaderboard_reads_the_metric_index(self, session: Session, metric):
+        """Test that the leaderboard walks the metric's index instead of sorting every career row"""
+        statement = leaderboard_statement(metric).compile(session.get_bind())
+        parameters = tuple(statement.params[name] for name in statement.positiontup)
+        
+        plan = session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + str(statement), parameters).all()
+        
+        assert f"SCAN playercareerstats USING INDEX ix_playercareerstats_{metric}" in [row[3] for row in plan]
+    
+    def test_leaderboard_invalid_metric(self, client: TestClient):
+        """Test that unknown metrics are rejected"""
+        response = client.get("/api/players/leaderboard", params={"metric": "own_goals"})
+        
+        assert response.status_code == 422
+
+
+class TestPlayerETags:
+    """Test conditional GETs on players"""
+    
+    def test_get_player_not_modified(self, client: TestClient, test_player):
+        """Test that a matching If-None-Match gets a 304 until the player changes"""
+        etag = client.get(f"/api/players/{test_player['id']}").headers["ETag"]
+        
+        response = client.get(f"/api/players/{test_player['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        
+        client.put(f"/api/players/{test_player['id']}", json={"nickname": "Ace"})
+        response = client.get(f"/api/players/{test_player['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+    
+    def test_goal_changes_player_etag(self, client: TestClient, test_game, test_player):
+        """Test that a goal refreshes the scorer's career stats and ETag"""
+        etag = client.get(f"/api/players/{test_player['id']}").headers["ETag"]
+        
+        client.post(f"/api/games/{test_game['id']}/goals", json={
+            "team_id": test_game["home_team"]["id"],
+            "scorer_id": test_player["id"]
+        })
+        
+        response = client.get(f"/api/players/{test_player['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["total_goals"] == 1
+    
+    def test_list_players_not_modified(self, client: TestClient, test_player):
+        """Test that an unchanged page of players gets a 304"""
+        etag = client.get("/api/players").headers["ETag"]
+        
+        assert client.get("/api/players", headers={"If-None-Match": etag}).status_code == 304
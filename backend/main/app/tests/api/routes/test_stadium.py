@@ -135,4 +135,64 @@ class TestStadiumCRUD:
         fake_id = str(uuid.uuid4())
         response = client.delete(f"/api/stadiums/{fake_id}")
         
-        assert response.status_code == 404
\ No newline at end of file
+        assert response.status_code == 404
+
+class TestStadiumCursorPagination:
+    """Test keyset pagination of the stadium list"""
+    
+    def test_list_stadiums_with_cursor(self, client: TestClient):
+        """Test walking the whole list page by page"""
+        for name in ["Delta", "Alpha", "Charlie", "Alpha", "Bravo"]:
+            client.post("/api/stadiums", json={"name": name})
+        
+        seen = []
+        response = client.get("/api/stadiums", params={"limit": 2})
+        while True:
+            assert response.status_code == 200
+            seen.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            response = client.get("/api/stadiums", params={"limit": 2, "cursor": cursor})
+        
+        assert [s["name"] for s in seen] == ["Alpha", "Alpha", "Bravo", "Charlie", "Delta"]
+        assert len({s["id"] for s in seen}) == 5
+    
+    def test_list_stadiums_last_page_has_no_cursor(self, client: TestClient, test_stadium):
+        """Test that a short page does not advertise a next cursor"""
+        response = client.get("/api/stadiums", params={"limit": 10})
+        
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+    
+    def test_list_stadiums_invalid_cursor(self, client: TestClient):
+        """Test that a garbled cursor is rejected"""
+        response = client.get("/api/stadiums", params={"cursor": "not-a-cursor"})
+        
+        assert response.status_code == 400
+        assert "cursor" in response.json()["detail"].lower()
+
+
+class TestStadiumETags:
+    """Test conditional GETs on stadiums"""
+    
+    def test_get_stadium_not_modified(self, client: TestClient, test_stadium):
+        """Test that a matching If-None-Match gets a 304 until the stadium changes"""
+        etag = client.get(f"/api/stadiums/{test_stadium['id']}").headers["ETag"]
+        
+        response = client.get(f"/api/stadiums/{test_stadium['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        
+        client.put(f"/api/stadiums/{test_stadium['id']}", params={"name": "New Ground"})
+        response = client.get(f"/api/stadiums/{test_stadium['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["name"] == "New Ground"
+    
+    def test_list_stadiums_not_modified(self, client: TestClient, test_stadium):
+        """Test that an unchanged page of stadiums gets a 304"""
+        etag = client.get("/api/stadiums").headers["ETag"]
+        
+        assert client.get("/api/stadiums", headers={"If-None-Match": etag}).status_code == 304
+        
+        client.post("/api/stadiums", json={"name": "Another Ground"})
+        assert client.get("/api/stadiums", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,94 @@
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api import deps
+from app.api.deps import READ_PRIMARY_COOKIE, REPLICA, get_read_db
+from app.main import app
+from app.models.model import Stadium
+
+
+@pytest.fixture
+def replica(client: TestClient, engine, tmp_path, monkeypatch):
+    """Route reads to a second database standing in for a replica"""
+    database = tmp_path / "replica.db"
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{database}"))
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    monkeypatch.setattr(deps, "async_engine", engine)
+    monkeypatch.setattr(deps, "replica_engine", replica_engine)
+    app.dependency_overrides.pop(get_read_db)
+    
+    with Session(create_engine(f"sqlite:///{database}")) as session:
+        session.add(Stadium(name="Replica Arena"))
+        session.commit()
+    yield
+    replica_engine.sync_engine.dispose()
+
+
+class TestReadRouting:
+    """Test that read-only routes are served from the replica"""
+    
+    def test_reads_go_to_the_replica(self, client: TestClient, replica):
+        """Test that reads without a recent write hit the replica"""
+        names = [s["name"] for s in client.get("/api/stadiums").json()]
+        
+        assert names == ["Replica Arena"]
+    
+    def test_writes_go_to_the_primary(self, client: TestClient, replica):
+        """Test that writes use the primary and pin the client's next reads to it"""
+        response = client.post("/api/stadiums", json={"name": "Primary Arena"})
+        
+        assert response.status_code == 200
+        assert READ_PRIMARY_COOKIE in response.cookies
+        assert "Max-Age=10" in response.headers["set-cookie"]
+        names = [s["name"] for s in client.get("/api/stadiums").json()]
+        assert names == ["Primary Arena"]
+    
+    def test_failed_writes_do_not_pin(self, client: TestClient, replica):
+        """Test that a rejected write leaves the client's reads on the replica"""
+        response = client.put(f"/api/games/{'0' * 32}/start")
+        
+        assert response.status_code == 404
+        assert READ_PRIMARY_COOKIE not in response.cookies
+    
+    def test_no_replica(self, client: TestClient, engine, monkeypatch):
+        """Test that everything runs on the primary, without cookies, when no replica is set"""
+        monkeypatch.setattr(deps, "async_engine", engine)
+        monkeypatch.setattr(deps, "replica_engine", None)
+        app.dependency_overrides.pop(get_read_db)
+        
+        response = client.post("/api/stadiums", json={"name": "Only Arena"})
+        
+        assert READ_PRIMARY_COOKIE not in response.cookies
+        assert [s["name"] for s in client.get("/api/stadiums").json()] == ["Only Arena"]
+    
+    def test_lagging_replica_does_not_fill_the_game_cache(self, client: TestClient, engine, test_game, tmp_path):
+        """Test that a stale game read from the replica is not cached over a newer edit"""
+        game_id = test_game["id"]
+        client.put(f"/api/games/{game_id}/start")
+        client.put(f"/api/games/{game_id}/end")
+        # The replica stops replaying here
+        shutil.copy(engine.url.database, tmp_path / "lagging.db")
+        lagging_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lagging.db'}", poolclass=NullPool)
+        client.put(f"/api/stadiums/{test_game['stadium']['id']}", params={"name": "Renamed Arena"})
+        
+        primary_override = app.dependency_overrides[get_read_db]
+        
+        async def lagging_read_db():
+            async with AsyncSession(lagging_engine, expire_on_commit=False) as session:
+                session.info[REPLICA] = True
+                yield session
+        
+        app.dependency_overrides[get_read_db] = lagging_read_db
+        stale = client.get(f"/api/games/{game_id}").json()
+        app.dependency_overrides[get_read_db] = primary_override
+        fresh = client.get(f"/api/games/{game_id}").json()
+        lagging_engine.sync_engine.dispose()
+        
+        assert stale["stadium"]["name"] != "Renamed Arena"
+        assert fresh["stadium"]["name"] == "Renamed Arena"
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+import uuid
+
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.api.responses import dumps
+from app.main import app
+from app.models.schema import GameRead, GlobalPlayerStats, LeaderboardEntry
+
+
+def assert_shape(model, body):
+    """The body is exactly what validating and dumping it through `model` gives"""
+    assert TypeAdapter(model).dump_python(TypeAdapter(model).validate_python(body), mode="json") == body
+
+
+class TestFastSerialization:
+    """Test that directly encoded responses keep their documented shape"""
+    
+    def test_dumps_matches_pydantic(self):
+        """Test that ids and datetimes are written as Pydantic writes them"""
+        game_id = uuid.uuid4()
+        started_at = datetime(2024, 5, 2, 20, 0, 12, 345000, tzinfo=timezone.utc)
+        
+        assert dumps({"id": game_id, "started_at": started_at}) == (
+            f'{{"id":"{game_id}","started_at":"2024-05-02T20:00:12.345000Z"}}'.encode()
+        )
+    
+    def test_game_routes(self, client: TestClient, test_game, test_player):
+        """Test that the game payloads match GameRead"""
+        game_id = test_game["id"]
+        team_id = test_game["home_team"]["id"]
+        client.post(f"/api/games/{game_id}/players", json={"player_id": test_player["id"], "team_id": team_id})
+        client.post(f"/api/games/{game_id}/goals", json={"scorer_id": test_player["id"], "team_id": team_id})
+        
+        assert_shape(GameRead, test_game)
+        assert_shape(GameRead, client.get(f"/api/games/{game_id}").json())
+        assert_shape(list[GameRead], client.get("/api/games").json())
+    
+    def test_player_routes(self, client: TestClient, test_player):
+        """Test that the player payloads match GlobalPlayerStats and LeaderboardEntry"""
+        assert_shape(GlobalPlayerStats, client.get(f"/api/players/{test_player['id']}").json())
+        assert_shape(GlobalPlayerStats, client.put(f"/api/players/{test_player['id']}", json={"nickname": "T"}).json())
+        assert_shape(list[GlobalPlayerStats], client.get("/api/players").json())
+        assert_shape(list[LeaderboardEntry], client.get("/api/players/leaderboard?min_games=0").json())
+    
+    def test_openapi_keeps_response_models(self):
+        """Test that the schema still documents the response models"""
+        paths = app.openapi()["paths"]
+        
+        schema = paths["/api/games/{game_id}"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema == {"$ref": "#/components/schemas/GameRead"}
+        schema = paths["/api/players"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema["items"] == {"$ref": "#/components/schemas/GlobalPlayerStats"}
+    
+    def test_openapi_marks_score_read_only(self):
+        """Test that the stored game score is documented as read-only"""
+        schemas = app.openapi()["components"]["schemas"]
+        
+        assert schemas["GameRead"]["properties"]["score"]["readOnly"] is True
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+from app.benchmarks.explain import explain_routes, full_scans
+from app.benchmarks.run import seeded_app
+from app.models.model import SQLModel
+
+
+class TestExplain:
+    """Test the query plans of the API routes"""
+    
+    def test_full_scans_are_detected(self, tmp_path: Path):
+        """Test that a filter on an unindexed column shows up as a full scan"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+        SQLModel.metadata.create_all(engine)
+        
+        with engine.connect() as connection:
+            assert full_scans(connection, "SELECT id FROM goal WHERE minute > ?", ("2024-01-01",)) == ["goal"]
+            assert full_scans(connection, "SELECT id FROM goal WHERE game_id = ?", ("0" * 32,)) == []
+    
+    def test_routes_do_not_scan_large_tables(self, tmp_path: Path):
+        """Test that no route reads the games, lineups or goals in full"""
+        with seeded_app("tiny", 20, 50, None, tmp_path) as seeded:
+            assert explain_routes(seeded) == {}
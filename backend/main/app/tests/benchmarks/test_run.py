@@ -0,0 +1,44 @@
+import re
+
+from fastapi.routing import APIRoute
+
+from app.benchmarks.run import ROUTES, run
+from app.main import app
+from app.benchmarks.seed import LIVE_GAMES, build_games
+
+
+class TestBenchmarks:
+    """Test the benchmark suite on a tiny dataset"""
+    
+    def test_build_games(self):
+        """Test that the synthetic archive is deterministic and leaves live games"""
+        games = build_games(players=12, games=20)
+        
+        assert games == build_games(players=12, games=20)
+        assert sum(game.ended_at is None for game in games) == LIVE_GAMES
+        assert all(len(game.home) == 5 and len(game.away) == 5 for game in games)
+        assert all(not game.goals for game in games if game.started_at is None)
+    
+    def test_run_reports_every_route(self):
+        """Test that every route is measured and succeeds"""
+        report = run({"tiny": {"players": 12, "games": 10}}, repeat=1)
+        
+        routes = report["sizes"]["tiny"]["routes"]
+        assert set(routes) == {route.name for route in ROUTES}
+        assert {result["status"] for result in routes.values()} == {200}
+        assert all(result["queries"] > 0 and result["peak_kib"] > 0 for result in routes.values())
+        assert report["sizes"]["tiny"]["seeded"]["games"] == 10
+    
+    def test_every_api_route_is_benchmarked(self):
+        """Test that ROUTES covers each method and path the API routers define"""
+        def template(path):
+            return re.sub(r"\{[^}]*\}", "{}", path.split("?")[0])
+        
+        api = {
+            (method, template(route.path))
+            for route in app.routes
+            if isinstance(route, APIRoute) and route.path.startswith("/api/")
+            for method in route.methods
+        }
+        
+        assert api == {(route.method, template(route.path)) for route in ROUTES}
@@ -0,0 +1,38 @@
+from app.commands.import_budget import build_report, parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       500 |        500 |     sqlalchemy.util
+import time:      1500 |       2000 |   sqlalchemy
+import time:       250 |        250 |   yaml
+import time:      1000 |       3250 | app.main
+"""
+
+
+class TestImportBudget:
+    """Test the import-time budget report"""
+    
+    def test_parse_importtime(self):
+        """Test parsing -X importtime output"""
+        rows = parse_importtime(SAMPLE)
+        
+        assert [row["module"] for row in rows] == ["sqlalchemy.util", "sqlalchemy", "yaml", "app.main"]
+        assert [row["depth"] for row in rows] == [2, 1, 1, 0]
+        assert rows[3]["cumulative_ms"] == 3.25
+    
+    def test_report_within_budget(self):
+        """Test that packages are ranked by their own import time"""
+        report = build_report(parse_importtime(SAMPLE), "app.main", budget_ms=10, top=2)
+        
+        assert report["total_ms"] == 3.25
+        assert report["over_budget"] is False
+        assert report["slowest_packages"] == [
+            {"package": "sqlalchemy", "self_ms": 2.0},
+            {"package": "app", "self_ms": 1.0},
+        ]
+        assert [m["module"] for m in report["app_modules"]] == ["app.main"]
+    
+    def test_report_over_budget(self):
+        """Test that exceeding the budget is flagged"""
+        report = build_report(parse_importtime(SAMPLE), "app.main", budget_ms=3, top=5)
+        
+        assert report["over_budget"] is True
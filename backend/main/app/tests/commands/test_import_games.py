@@ -0,0 +1,109 @@
+from datetime import datetime
+import io
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app.commands.import_games import import_games, parse_csv, parse_ndjson, resolve_names
+from app.models.model import Player
+
+NDJSON = """
+{"date": "2024-05-02T20:00:00", "stadium": "Palaghiaccio", "home": ["Rossi", "Bianchi"], "away": ["Verdi"], "goals": [{"team": "home", "scorer": "Rossi", "assister": "Bianchi"}, {"team": "away", "scorer": "Verdi"}, {"team": "home", "scorer": "Rossi"}]}
+{"date": "2024-05-09T20:00:00", "stadium": "Palaghiaccio", "started_at": "2024-05-09T20:05:00", "ended_at": "2024-05-09T21:00:00", "home": ["Verdi"], "away": ["Rossi"], "goals": []}
+"""
+
+CSV = """game,date,stadium,started_at,ended_at,kind,team,player,assister,minute
+g1,2024-05-02T20:00:00,Palaghiaccio,,,lineup,home,Rossi,,
+g1,2024-05-02T20:00:00,Palaghiaccio,,,lineup,away,Verdi,,
+g1,2024-05-02T20:00:00,Palaghiaccio,,,goal,home,Rossi,,2024-05-02T20:12:00
+g2,2024-05-09T20:00:00,Nuovo Campo,2024-05-09T20:05:00,,lineup,home,Verdi,,
+"""
+
+
+class TestImportGames:
+    """Test the bulk historical import"""
+    
+    def test_parse_csv(self):
+        """Test grouping CSV rows into games"""
+        games = parse_csv(io.StringIO(CSV))
+        
+        assert [(g.stadium, g.home, g.away, len(g.goals)) for g in games] == [
+            ("Palaghiaccio", ["Rossi"], ["Verdi"], 1),
+            ("Nuovo Campo", ["Verdi"], [], 0),
+        ]
+        assert [(g.started_at, g.ended_at) for g in games] == [
+            (datetime(2024, 5, 2, 20), datetime(2024, 5, 2, 20)),
+            (datetime(2024, 5, 9, 20, 5), None),
+        ]
+    
+    def test_imported_games_are_ended(self, client: TestClient, session):
+        """Test that games without start and end times are imported as played"""
+        import_games(session, parse_ndjson(NDJSON.splitlines()))
+        session.commit()
+        
+        games = client.get("/api/games").json()
+        assert [(g["status"], g["ended_at"]) for g in games] == [
+            ("ended", "2024-05-09T21:00:00"),
+            ("ended", "2024-05-02T20:00:00"),
+        ]
+        assert client.put(f"/api/games/{games[0]['id']}/start").status_code == 400
+    
+    def test_import_games(self, client: TestClient, session):
+        """Test that imported games read back like games entered through the API"""
+        counts = import_games(session, parse_ndjson(NDJSON.splitlines()))
+        session.commit()
+        
+        assert counts == {"games": 2, "appearances": 5, "goals": 3, "stadiums": 1, "players": 3, "skipped": 0}
+        games = client.get("/api/games").json()
+        first = games[-1]
+        assert first["stadium"]["name"] == "Palaghiaccio"
+        assert first["score"] == {"home_team": 2, "away_team": 1}
+        assert {p["name"]: p["goals"] for p in first["home_team"]["players"]} == {"Rossi": 2, "Bianchi": 0}
+        
+        rossi = next(p for p in client.get("/api/players").json() if p["name"] == "Rossi")
+        assert (rossi["games_played"], rossi["total_goals"], rossi["wins"], rossi["draws"]) == (2, 2, 1, 1)
+    
+    def test_import_reuses_existing_players(self, client: TestClient, session):
+        """Test that names already in the database are matched, not duplicated"""
+        existing = client.post("/api/players", json={"name": "Rossi"}).json()
+        
+        import_games(session, parse_csv(io.StringIO(CSV)))
+        session.commit()
+        
+        rossi = session.exec(select(Player).where(Player.name == "Rossi")).all()
+        assert [str(p.id) for p in rossi] == [existing["id"]]
+        assert client.get(f"/api/players/{existing['id']}").json()["total_goals"] == 1
+    
+    def test_import_changes_player_etags(self, client: TestClient, session):
+        """Test that players whose careers the import changed get a new ETag"""
+        existing = client.post("/api/players", json={"name": "Rossi"}).json()
+        etag = client.get(f"/api/players/{existing['id']}").headers["ETag"]
+        
+        import_games(session, parse_csv(io.StringIO(CSV)))
+        session.commit()
+        
+        response = client.get(f"/api/players/{existing['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["total_goals"] == 1
+    
+    def test_duplicate_names_resolve_to_the_lowest_id(self, session):
+        """Test that a name shared by several rows always maps to the same one"""
+        ids = sorted([uuid.uuid4(), uuid.uuid4()])
+        session.add_all([Player(id=ids[1], name="Rossi"), Player(id=ids[0], name="Rossi")])
+        session.commit()
+        
+        assert resolve_names(session, Player, ["Rossi"]) == {"Rossi": ids[0]}
+    
+    def test_reimport_skips_existing_games(self, client: TestClient, session):
+        """Test that importing the same file twice does not duplicate games or stats"""
+        import_games(session, parse_ndjson(NDJSON.splitlines()))
+        session.commit()
+        
+        counts = import_games(session, parse_ndjson(NDJSON.splitlines() * 2))
+        session.commit()
+        
+        assert (counts["games"], counts["goals"], counts["skipped"]) == (0, 0, 4)
+        assert len(client.get("/api/games").json()) == 2
+        rossi = next(p for p in client.get("/api/players").json() if p["name"] == "Rossi")
+        assert (rossi["games_played"], rossi["total_goals"]) == (2, 2)
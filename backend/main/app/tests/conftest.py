@@ -1,37 +1,63 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine, SQLModel
-from sqlmodel.pool import StaticPool
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.main import app
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
+from app.core.cache import game_cache
+from app.core.timing import instrument_engine
 from datetime import datetime
 
 
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    """Create a fresh database file for each test, served through aiosqlite"""
+    database = tmp_path / "test.db"
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{database}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    instrument_engine(engine.sync_engine)
+    yield engine
+    engine.sync_engine.dispose()
+
+
 @pytest.fixture(name="session")
-def session_fixture():
-    """Create a fresh database for each test"""
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as session:
+def session_fixture(engine):
+    """Synchronous session on the test database, for direct checks in tests"""
+    with Session(create_engine(engine.url.set(drivername="sqlite"))) as session:
         yield session
 
 
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
+def client_fixture(engine):
     """Create a test client with the test database"""
-    def get_session_override():
-        return session
+    async def get_session_override():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
 
     app.dependency_overrides[get_db] = get_session_override
+    app.dependency_overrides[get_read_db] = get_session_override
+    game_cache.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def query_log(engine):
+    """Collect every SQL statement the API sends to the test database"""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest.fixture
 def test_player(client: TestClient):
     """Fixture that creates a test player and cleans up after the test"""
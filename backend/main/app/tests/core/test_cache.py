@@ -0,0 +1,59 @@
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+class TestTTLCache:
+    """Test the bounded LRU/TTL cache"""
+    
+    def test_get_and_set(self):
+        """Test storing a value and counting hits and misses"""
+        c = TTLCache(maxsize=2, ttl=60)
+        
+        assert c.get("a") is None
+        c.set("a", b"1")
+        
+        assert c.get("a") == b"1"
+        assert (c.hits, c.misses) == (1, 1)
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the entry used longest ago is dropped first"""
+        c = TTLCache(maxsize=2, ttl=60)
+        c.set("a", 1)
+        c.set("b", 2)
+        c.get("a")
+        c.set("c", 3)
+        
+        assert c.get("b") is None
+        assert c.get("a") == 1
+        assert c.get("c") == 3
+        assert len(c) == 2
+    
+    def test_expires_entries(self, monkeypatch):
+        """Test that entries are dropped once their TTL has passed"""
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        c = TTLCache(maxsize=2, ttl=10)
+        c.set("a", 1)
+        
+        now[0] += 11
+        
+        assert c.get("a") is None
+        assert len(c) == 0
+    
+    def test_invalidate(self):
+        """Test dropping specific keys, including unknown ones"""
+        c = TTLCache(maxsize=4, ttl=60)
+        c.set("a", 1)
+        c.set("b", 2)
+        
+        c.invalidate(["a", "missing"])
+        
+        assert c.get("a") is None
+        assert c.get("b") == 2
+    
+    def test_disabled_cache(self):
+        """Test that a zero size turns the cache off"""
+        c = TTLCache(maxsize=0, ttl=60)
+        c.set("a", 1)
+        
+        assert c.get("a") is None
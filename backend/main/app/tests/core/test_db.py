@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import PostgresSettings
+from app.core.db import DATABASE_URL, engine_options
+
+
+def make_settings(**overrides) -> PostgresSettings:
+    return PostgresSettings(
+        POSTGRES_SERVER="db",
+        POSTGRES_PORT=5432,
+        POSTGRES_DB="igloo",
+        POSTGRES_USER="igloo",
+        POSTGRES_PASSWORD="secret",
+        **overrides
+    )
+
+
+class TestPoolProfiles:
+    """Test the connection pooling profiles"""
+    
+    def test_default_profile(self):
+        """Test that the default profile uses the configured queue pool"""
+        options = engine_options(make_settings(POSTGRES_POOL_SIZE=8))
+        
+        assert options["pool_size"] == 8
+        assert "poolclass" not in options
+    
+    def test_lambda_profile(self):
+        """Test that the Lambda profile keeps one pre-pinged, recycled connection"""
+        options = engine_options(make_settings(POSTGRES_POOL_PROFILE="lambda", POSTGRES_POOL_RECYCLE=120))
+        
+        assert options["pool_size"] == 1
+        assert options["max_overflow"] == 0
+        assert options["pool_pre_ping"] is True
+        assert options["pool_recycle"] == 120
+    
+    def test_external_profile(self):
+        """Test that the external profile leaves pooling to the pooler"""
+        options = engine_options(make_settings(POSTGRES_POOL_PROFILE="external"))
+        
+        assert options["poolclass"] is NullPool
+        assert options["connect_args"]["prepare_threshold"] is None
+    
+    @pytest.mark.parametrize("profile", ["default", "lambda", "external"])
+    def test_profiles_build_an_async_engine(self, profile):
+        """Test that every profile is accepted by the async engine"""
+        engine = create_async_engine(DATABASE_URL, **engine_options(make_settings(POSTGRES_POOL_PROFILE=profile)))
+        
+        assert engine.pool is not None
+    
+    def test_unknown_profile(self):
+        """Test that a typo in the profile is caught at startup"""
+        with pytest.raises(ValueError):
+            make_settings(POSTGRES_POOL_PROFILE="lamda")
+    
+    def test_health_reports_pool(self, client: TestClient):
+        """Test that the health check exposes pool statistics"""
+        response = client.get("/health")
+        
+        assert response.status_code == 200
+        pool = response.json()["db_pool"]
+        assert pool["profile"] == "default"
+        assert pool["checked_out"] == 0
@@ -0,0 +1,145 @@
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.events import EventBroker, MemoryBackend, PostgresBackend, sse_message, sse_stream
+
+
+async def publish(broker: EventBroker, channel: str, type: str, data: dict, commit: bool = True):
+    """Publish one event from its own transaction"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with AsyncSession(engine) as session:
+        await broker.publish(session, channel, type, data)
+        if commit:
+            await session.commit()
+        else:
+            await session.rollback()
+    await engine.dispose()
+
+
+class TestEventBroker:
+    """Test the in-process game event broker"""
+    
+    def test_publish_reaches_subscribers_of_the_channel(self):
+        """Test that events only go to subscribers of their own game"""
+        async def scenario():
+            broker = EventBroker()
+            async with broker.subscribe("game-1") as mine, broker.subscribe("game-2") as other:
+                await publish(broker, "game-1", "goals", {"score": {"home_team": 1, "away_team": 0}})
+                return mine.get_nowait(), other.empty()
+        
+        event, other_empty = asyncio.run(scenario())
+        
+        assert event == {"type": "goals", "data": {"score": {"home_team": 1, "away_team": 0}}}
+        assert other_empty
+    
+    def test_unsubscribe_on_exit(self):
+        """Test that closed streams stop receiving events"""
+        async def scenario():
+            broker = EventBroker()
+            async with broker.subscribe("game-1"):
+                assert broker.subscriber_count("game-1") == 1
+            return broker.subscriber_count("game-1")
+        
+        assert asyncio.run(scenario()) == 0
+    
+    def test_events_wait_for_commit(self):
+        """Test that events go out when the transaction commits, and never if it rolls back"""
+        async def scenario():
+            broker = EventBroker()
+            engine = create_async_engine("sqlite+aiosqlite://")
+            async with broker.subscribe("game-1") as queue, AsyncSession(engine) as session:
+                await broker.publish(session, "game-1", "status", {"status": "started"})
+                before_commit = queue.qsize()
+                await session.commit()
+                after_commit = queue.qsize()
+                await publish(broker, "game-1", "status", {"status": "ended"}, commit=False)
+                after_rollback = queue.qsize()
+            await engine.dispose()
+            return before_commit, after_commit, after_rollback
+        
+        assert asyncio.run(scenario()) == (0, 1, 1)
+    
+    def test_postgres_backend_notifies_on_the_session_connection(self, tmp_path):
+        """Test that NOTIFY runs in the publishing transaction, without a second pooled connection"""
+        notified = []
+        
+        async def scenario():
+            # The Lambda pool: one connection, no overflow
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'events.db'}",
+                                         pool_size=1, max_overflow=0, pool_timeout=1)
+            
+            @event.listens_for(engine.sync_engine, "connect")
+            def add_pg_notify(dbapi_connection, connection_record):
+                dbapi_connection.create_function("pg_notify", 2, lambda channel, payload: notified.append(channel))
+            
+            broker = EventBroker(PostgresBackend("postgresql://unused"))
+            async with AsyncSession(engine) as session:
+                await session.connection()
+                await broker.publish(session, "game-1", "status", {"status": "started"})
+                await session.commit()
+            await engine.dispose()
+        
+        asyncio.run(scenario())
+        
+        assert notified == ["game_events"]
+    
+    def test_backend_starts_with_first_subscriber(self):
+        """Test that the backend is started once, by the first subscriber"""
+        class CountingBackend(MemoryBackend):
+            starts = 0
+            
+            async def start(self):
+                self.starts += 1
+        
+        async def scenario():
+            broker = EventBroker(CountingBackend())
+            before = broker.backend.starts
+            async with broker.subscribe("game-1"), broker.subscribe("game-2"):
+                pass
+            return before, broker.backend.starts
+        
+        assert asyncio.run(scenario()) == (0, 1)
+    
+    def test_slow_subscriber_drops_events(self):
+        """Test that a full queue drops events instead of growing"""
+        async def scenario():
+            broker = EventBroker(queue_size=2)
+            async with broker.subscribe("game-1") as queue:
+                for minute in range(5):
+                    await publish(broker, "game-1", "goals", {"minute": minute})
+                return queue.qsize()
+        
+        assert asyncio.run(scenario()) == 2
+
+
+class TestSSEStream:
+    """Test the text/event-stream encoding"""
+    
+    def test_sse_message(self):
+        """Test formatting an event as an SSE message"""
+        message = sse_message({"type": "status", "data": {"status": "started"}})
+        
+        assert message == 'event: status\ndata: {"status": "started"}\n\n'
+    
+    def test_stream_ends_with_the_game(self):
+        """Test that the stream forwards events and closes once the game ends"""
+        async def scenario():
+            broker = EventBroker()
+            stream = sse_stream(broker, "game-1", keepalive=0.01)
+            messages = [await anext(stream)]
+            await publish(broker, "game-1", "status", {"status": "started"})
+            await publish(broker, "game-1", "status", {"status": "ended"})
+            messages += [message async for message in stream]
+            return messages, broker.subscriber_count("game-1")
+        
+        messages, subscribers = asyncio.run(scenario())
+        
+        assert messages[0] == ": connected\n\n"
+        assert [m for m in messages if m.startswith("event:")] == [
+            'event: status\ndata: {"status": "started"}\n\n',
+            'event: status\ndata: {"status": "ended"}\n\n',
+        ]
+        assert subscribers == 0
@@ -0,0 +1,148 @@
+import asyncio
+from collections import defaultdict
+import json
+import logging
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core import db
+from app.core.config import app_settings
+from app.core.metrics import POOL_BUCKETS, Histogram, Metrics, emf_record, metrics
+
+
+class TestMetrics:
+    """Test the request, pool and cache metrics"""
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that the exposition follows Prometheus' le semantics"""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        
+        samples = list(histogram.samples("latency", ""))
+        
+        assert samples[:3] == ['latency_bucket{le="0.1"} 2', 'latency_bucket{le="1.0"} 3', 'latency_bucket{le="+Inf"} 4']
+        assert samples[-1] == "latency_count{} 4"
+    
+    def test_requests_are_counted_by_route_template(self, client: TestClient, test_game):
+        """Test that routes are labelled by template, not by concrete path"""
+        client.get(f"/api/games/{test_game['id']}")
+        client.get("/api/games/00000000-0000-0000-0000-000000000000")
+        
+        body = client.get("/metrics").text
+        
+        assert 'http_requests_total{method="GET",route="/api/games/{game_id}",status="200"}' in body
+        assert 'http_requests_total{method="GET",route="/api/games/{game_id}",status="404"}' in body
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/games/{game_id}"}' in body
+        assert test_game["id"] not in body
+    
+    def test_metrics_endpoint(self, client: TestClient):
+        """Test that the scrape exposes in-flight, pool and cache figures"""
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_requests_in_flight 1" in response.text
+        assert "db_pool_checkouts_total" in response.text
+        assert 'cache_hit_ratio{cache="game"}' in response.text
+    
+    def test_pool_instrumentation(self):
+        """Test that checkouts, connects and connect times are recorded"""
+        engine = create_engine("sqlite://", poolclass=QueuePool)
+        pool_metrics = Metrics()
+        pool_metrics.instrument_pool(engine)
+        
+        for _ in range(2):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        
+        assert pool_metrics.pool_checkouts["primary"] == 2
+        assert pool_metrics.pool_connects["primary"] == 1
+        assert pool_metrics.connect_time["primary"].count == 1
+        assert pool_metrics.pool_wait_time["primary"].count == 2
+    
+    def test_pool_wait_is_timed(self):
+        """Test that a checkout queueing for a busy pool records the wait, timeouts included"""
+        engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+        pool_metrics = Metrics()
+        pool_metrics.instrument_pool(engine)
+        
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        
+        wait_time = pool_metrics.pool_wait_time["primary"]
+        assert wait_time.count == 2
+        assert wait_time.sum >= 0.05
+        assert db._pool_figures(engine.pool)["pool"] == "QueuePool"
+    
+    def test_pool_instrumentation_survives_dispose(self):
+        """Test that the pool engine.dispose() creates is instrumented too"""
+        engine = create_engine("sqlite://", poolclass=QueuePool)
+        pool_metrics = Metrics()
+        pool_metrics.instrument_pool(engine)
+        
+        for _ in range(2):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            engine.dispose()
+        
+        counts = (pool_metrics.pool_checkouts["primary"], pool_metrics.pool_connects["primary"],
+                  pool_metrics.connect_time["primary"].count, pool_metrics.pool_wait_time["primary"].count)
+        assert counts == (2, 2, 2, 2)
+    
+    def test_replica_pool_is_labelled(self, client: TestClient, monkeypatch, tmp_path):
+        """Test that a configured replica exports its own pool figures"""
+        replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+        monkeypatch.setattr(db, "replica_engine", replica_engine)
+        monkeypatch.setattr(metrics, "pool_checkouts", defaultdict(int))
+        monkeypatch.setattr(metrics, "pool_wait_time", defaultdict(lambda: Histogram(POOL_BUCKETS)))
+        metrics.instrument_pool(replica_engine.sync_engine, "replica")
+        
+        async def use_replica():
+            async with replica_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            await replica_engine.dispose()
+        asyncio.run(use_replica())
+        body = client.get("/metrics").text
+        
+        assert 'db_pool_checkouts_total{pool="replica"} 1' in body
+        assert 'db_pool_wait_seconds_count{pool="replica"} 1' in body
+        assert 'db_pool_checked_out{pool="primary"} 0' in body
+        assert 'db_pool_checked_out{pool="replica"} 0' in body
+        assert client.get("/health").json()["db_pool"]["replica"]["checked_out"] == 0
+    
+    def test_emf_record(self):
+        """Test that a request maps onto a CloudWatch EMF document"""
+        record = emf_record("GET", "/api/games/{game_id}", 503, 0.0125)
+        
+        directive = record["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Dimensions"] == [["Route"]]
+        assert record["Route"] == "GET /api/games/{game_id}"
+        assert record["Latency"] == 12.5
+        assert record["Errors"] == 1
+    
+    def test_emf_sink(self, client: TestClient, monkeypatch, caplog):
+        """Test that METRICS_EMF logs one JSON document per request"""
+        monkeypatch.setattr(app_settings, "METRICS_EMF", True)
+        emf_logger = logging.getLogger("app.metrics")
+        emf_logger.addHandler(caplog.handler)
+        try:
+            with caplog.at_level(logging.INFO, logger="app.metrics"):
+                client.get("/api/stadiums")
+        finally:
+            emf_logger.removeHandler(caplog.handler)
+        
+        record = json.loads(next(r for r in caplog.records if r.name == "app.metrics").getMessage())
+        assert record["Route"] == "GET /api/stadiums"
+        assert record["Requests"] == 1
+    
+    def test_in_flight_returns_to_zero(self, client: TestClient):
+        """Test that finished requests leave the in-flight gauge"""
+        client.get("/api/stadiums")
+        
+        assert metrics.in_flight == 0
@@ -0,0 +1,50 @@
+import logging
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.core.config import app_settings
+from app.core.timing import collect_stats
+from app.models.model import Player
+
+
+class TestServerTiming:
+    """Test per-request SQL instrumentation"""
+    
+    def test_server_timing_header(self, client: TestClient, test_game):
+        """Test that the statements of a request are reported in Server-Timing"""
+        response = client.get(f"/api/games/{test_game['id']}")
+        
+        timing = response.headers["Server-Timing"]
+        assert 'desc="4 statements"' in timing
+        assert 'desc="0 lazy loads"' in timing
+        assert "db;dur=" in timing and "total;dur=" in timing
+    
+    def test_header_can_be_disabled(self, client: TestClient, monkeypatch):
+        """Test that SERVER_TIMING=false hides the header"""
+        monkeypatch.setattr(app_settings, "SERVER_TIMING", False)
+        
+        assert "Server-Timing" not in client.get("/api/stadiums").headers
+    
+    def test_structured_log_line(self, client: TestClient, caplog):
+        """Test that every request logs one JSON line with its SQL figures"""
+        timing_logger = logging.getLogger("app.timing")
+        timing_logger.addHandler(caplog.handler)
+        try:
+            with caplog.at_level(logging.INFO, logger="app.timing"):
+                client.get("/api/stadiums")
+        finally:
+            timing_logger.removeHandler(caplog.handler)
+        
+        record = next(r for r in caplog.records if r.name == "app.timing")
+        assert '"path": "/api/stadiums"' in record.getMessage()
+        assert '"statements": 1' in record.getMessage()
+    
+    def test_counts_lazy_loads(self, session, test_player):
+        """Test that relationship attributes loaded on access are counted"""
+        player = session.get(Player, uuid.UUID(test_player["id"]))
+        
+        with collect_stats() as stats:
+            player.game_players
+        
+        assert stats.lazy_loads == 1
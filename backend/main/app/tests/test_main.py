@@ -0,0 +1,57 @@
+import asyncio
+import signal
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.config import app_settings
+
+
+class TestStartup:
+    """Test application startup modes"""
+    
+    def test_startup_creates_schema(self, monkeypatch):
+        """Test that the default mode creates missing tables on startup"""
+        calls = []
+        monkeypatch.setattr(main, "init_db", lambda: calls.append("init_db"))
+        monkeypatch.setattr(app_settings, "FAST_START", False)
+        
+        with TestClient(main.app):
+            pass
+        
+        assert calls == ["init_db"]
+    
+    def test_fast_start_skips_schema_creation(self, monkeypatch):
+        """Test that fast-start mode leaves the schema to migrations"""
+        calls = []
+        monkeypatch.setattr(main, "init_db", lambda: calls.append("init_db"))
+        monkeypatch.setattr(app_settings, "FAST_START", True)
+        
+        with TestClient(main.app):
+            pass
+        
+        assert calls == []
+    
+    def test_lambda_fast_start_shuts_down_on_sigterm(self, monkeypatch):
+        """Test that fast-start Lambda handlers skip the lifespan and clean up on SIGTERM"""
+        calls = []
+        
+        async def shutdown():
+            calls.append("shutdown")
+        
+        monkeypatch.setattr(main, "shutdown", shutdown)
+        monkeypatch.setattr(app_settings, "FAST_START", True)
+        previous = signal.getsignal(signal.SIGTERM)
+        try:
+            handler = main._lambda_handler()
+            assert handler.lifespan == "off"
+            assert signal.getsignal(signal.SIGTERM) is main._shutdown_on_sigterm
+            
+            asyncio.set_event_loop(asyncio.new_event_loop())
+            main._shutdown_on_sigterm(signal.SIGTERM, None)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            asyncio.get_event_loop().close()
+            asyncio.set_event_loop(None)
+        
+        assert calls == ["shutdown"]
@@ -4,6 +4,8 @@ import type {
   Stadium,
   Game,
   GlobalPlayerStats,
+  LeaderboardEntry,
+  LeaderboardMetric,
   GamePlayerStats,
   PlayerCreate,
   GameCreate,
@@ -26,6 +28,8 @@ export const playersApi = {
   delete: (id: string) => api.delete(`/players/${id}`),
   getGames: (id: string) => api.get<GamePlayerStats[]>(`/players/${id}/games`),
   searchByName: (name: string) => api.get<Player[]>('/players/search/by-name', { params: { name } }),
+  leaderboard: (metric: LeaderboardMetric = 'goals', limit = 10, min_games = 1) =>
+    api.get<LeaderboardEntry[]>('/players/leaderboard', { params: { metric, limit, min_games } }),
 }
 
 // Games
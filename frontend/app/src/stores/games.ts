@@ -1,7 +1,7 @@
 import { defineStore } from 'pinia'
 import { ref } from 'vue'
 import { gamesApi } from '@/services/api'
-import type { Game, GameCreate, GoalCreate } from '@/types'
+import type { Game, GameCreate, GameEvent, Goal, GoalCreate } from '@/types'
 
 export const useGamesStore = defineStore('games', () => {
   const games = ref<Game[]>([])
@@ -140,6 +140,56 @@ export const useGamesStore = defineStore('games', () => {
     }
   }
 
+  // Lineup counters of a goal's scorer and assister, sign +1 or -1
+  function countGoal(game: Game, goal: Goal, sign: number) {
+    const lineup = [...game.home_team.players, ...game.away_team.players]
+    const scorer = lineup.find(p => p.id === goal.scorer.id)
+    if (scorer) scorer.goals += sign
+    const assister = goal.assister && lineup.find(p => p.id === goal.assister!.id)
+    if (assister) assister.assists += sign
+  }
+
+  // Apply a live event to the open game, without refetching it
+  function applyGameEvent(gameId: string, event: GameEvent) {
+    const game = currentGame.value
+    if (!game || game.id !== gameId) return
+
+    switch (event.type) {
+      case 'lineup':
+        for (const { team_id, player } of event.data.players) {
+          const team = team_id === game.home_team.id ? game.home_team : game.away_team
+          if (!team.players.some(p => p.id === player.id)) {
+            team.players.push({ ...player, goals: 0, assists: 0 })
+          }
+        }
+        break
+      case 'goals':
+        // Batch inserts send every goal of the game: merge by id
+        for (const goal of event.data.goals) {
+          if (!game.goals.some(g => g.id === goal.id)) {
+            game.goals.push(goal)
+            countGoal(game, goal, 1)
+          }
+        }
+        game.score = event.data.score
+        break
+      case 'goal_deleted': {
+        const goal = game.goals.find(g => g.id === event.data.goal_id)
+        if (goal) {
+          game.goals = game.goals.filter(g => g.id !== goal.id)
+          countGoal(game, goal, -1)
+        }
+        game.score = event.data.score
+        break
+      }
+      case 'status':
+        game.status = event.data.status
+        game.started_at = event.data.started_at
+        game.ended_at = event.data.ended_at
+        break
+    }
+  }
+
   return {
     games,
     currentGame,
@@ -147,6 +197,7 @@ export const useGamesStore = defineStore('games', () => {
     error,
     fetchGames,
     fetchGameById,
+    applyGameEvent,
     createGame,
     addPlayerToGame,
     recordGoal,
@@ -1,11 +1,12 @@
 import { defineStore } from 'pinia'
 import { ref } from 'vue'
 import { playersApi } from '@/services/api'
-import type { GlobalPlayerStats, GamePlayerStats, PlayerCreate, Player } from '@/types'
+import type { GlobalPlayerStats, GamePlayerStats, LeaderboardEntry, LeaderboardMetric, PlayerCreate, Player } from '@/types'
 
 export const usePlayersStore = defineStore('players', () => {
   const players = ref<GlobalPlayerStats[]>([])
   const currentPlayer = ref<GlobalPlayerStats | null>(null)
+  const leaderboard = ref<LeaderboardEntry[]>([])
   const currentPlayerGames = ref<GamePlayerStats[]>([])
   const loading = ref(false)
   const error = ref<string | null>(null)
@@ -24,6 +25,20 @@ export const usePlayersStore = defineStore('players', () => {
     }
   }
 
+  async function fetchLeaderboard(metric: LeaderboardMetric = 'goals', limit = 10, minGames = 1) {
+    loading.value = true
+    error.value = null
+    try {
+      const response = await playersApi.leaderboard(metric, limit, minGames)
+      leaderboard.value = response.data
+    } catch (e) {
+      error.value = 'Failed to fetch leaderboard'
+      console.error(e)
+    } finally {
+      loading.value = false
+    }
+  }
+
   async function fetchPlayerById(id: string) {
     loading.value = true
     error.value = null
@@ -125,9 +140,11 @@ export const usePlayersStore = defineStore('players', () => {
     players,
     currentPlayer,
     currentPlayerGames,
+    leaderboard,
     loading,
     error,
     fetchPlayers,
+    fetchLeaderboard,
     fetchPlayerById,
     fetchPlayerGames,
     createPlayer,
@@ -16,9 +16,17 @@ export interface GlobalPlayerStats {
   total_goals: number
   total_assists: number
   wins: number
+  draws: number
+  losses: number
   goals_per_game: number
 }
 
+export type LeaderboardMetric = 'goals' | 'assists' | 'wins' | 'goals_per_game'
+
+export interface LeaderboardEntry extends GlobalPlayerStats {
+  rank: number
+}
+
 export interface GamePlayerStats {
   game_id: string
   date: string
@@ -96,4 +104,10 @@ export interface Game {
 
   status: 'not_started' | 'started' | 'ended'
   score: GameScore
-}
\ No newline at end of file
+}
+// Live events pushed by /api/games/{id}/events
+export type GameEvent =
+  | { type: 'lineup', data: { players: { team_id: string, player: Player }[] } }
+  | { type: 'goals', data: { goals: Goal[], score: GameScore } }
+  | { type: 'goal_deleted', data: { goal_id: string, score: GameScore } }
+  | { type: 'status', data: { status: Game['status'], started_at: string | null, ended_at: string | null } }
@@ -64,6 +64,9 @@ resource "aws_lambda_function" "lambda_model_function" {
         POSTGRES_DB       = var.POSTGRES_DB
         POSTGRES_USER     = var.POSTGRES_USER
         POSTGRES_PASSWORD = var.POSTGRES_PASSWORD
+        POSTGRES_POOL_PROFILE = var.POSTGRES_POOL_PROFILE
+        # No create_all() on cold starts: run `alembic upgrade head` before deploying
+        FAST_START = "true"
       }
     }
 }
@@ -62,4 +62,9 @@ variable "POSTGRES_USER" {
 }
 variable "POSTGRES_PASSWORD" {
     type = string
+}
+variable "POSTGRES_POOL_PROFILE" {
+    description = "Connection pooling profile: lambda, or external behind RDS Proxy/PgBouncer"
+    type = string
+    default = "lambda"
 }
\ No newline at end of file